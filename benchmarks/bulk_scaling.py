@@ -0,0 +1,83 @@
+# -*- coding: utf-8; -*-
+"""Measures how gherkin.bulk scales with the number of worker processes
+
+Writes a synthetic tree of feature files to a temporary directory and
+parses it with 1, 2, 4 and 8 workers:
+
+    $ python -m benchmarks.bulk_scaling --files 4000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from gherkin import bulk
+
+
+FEATURE = '''\
+@feature-{index}
+Feature: Generated feature {index}
+  In order to measure the bulk parser
+  As a benchmark
+
+  Background:
+    Given the system number {index} is up
+
+  @smoke
+  Scenario: First scenario of {index}
+    Given I am logged in
+    When I open the page {index}
+    Then I see the following items:
+      | name  | price |
+      | apple | 10    |
+      | pear  | 20    |
+
+  Scenario Outline: Outline of {index}
+    Given I have <count> items
+    When I remove <removed>
+    Then I have <left> left
+  Examples:
+    | count | removed | left |
+    | 10    | 2       | 8    |
+    | 5     | 5       | 0    |
+'''
+
+
+def write_tree(root, files, per_directory=100):
+    for index in range(files):
+        directory = os.path.join(root, 'd{:04}'.format(index // per_directory))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, 'f{:06}.feature'.format(index))
+        with open(path, 'w') as fileobj:
+            fileobj.write(FEATURE.format(index=index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=4000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--batch-size', type=int, default=bulk.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        write_tree(root, args.files)
+        paths = bulk.find_features(root)
+        print('{} files, {} CPUs'.format(len(paths), os.cpu_count()))
+        print('{:>8} {:>10} {:>12}'.format('workers', 'seconds', 'files/s'))
+        for workers in args.workers:
+            started = time.perf_counter()
+            for _ in bulk.parse_paths(paths, workers, args.batch_size):
+                pass
+            elapsed = time.perf_counter() - started
+            print('{:>8} {:>10.3f} {:>12.0f}'.format(
+                workers, elapsed, len(paths) / elapsed))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8; -*-
+"""Generates synthetic feature files for benchmarks
+
+The same options and seed always produce the same text, so results can
+be compared between commits:
+
+    $ python -m benchmarks.corpus --scenarios 100 --language pt-br
+"""
+
+import argparse
+import random
+import sys
+
+from gherkin.languages import keyword
+
+
+WORDS = ('apple', 'pear', 'user', 'order', 'account', 'page', 'report',
+         'invoice', 'basket', 'item', 'price', 'total', 'name', 'email')
+
+
+class Options(object):
+    "What the generated features look like"
+
+    def __init__(self, scenarios=100, steps=4, table_width=3, table_rows=3,
+                 docstring_lines=5, outline_rows=5, language='en',
+                 tag_density=1.0, seed=0):
+        self.scenarios = scenarios  # Scenarios and outlines per feature
+        self.steps = steps  # Steps per scenario
+        self.table_width = table_width  # Columns of step tables
+        self.table_rows = table_rows  # Rows of step tables, 0 for none
+        self.docstring_lines = docstring_lines  # 0 for no docstrings
+        self.outline_rows = outline_rows  # Every 4th scenario is an outline
+        self.language = language
+        self.tag_density = tag_density  # Average number of tags per scenario
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class Generator(object):
+
+    def __init__(self, options):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.keywords = dict(
+            (kind, keyword(options.language, kind))
+            for kind in ('feature', 'background', 'scenario',
+                         'scenario_outline', 'examples', 'given'))
+
+    def words(self, count):
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def tags(self, indent):
+        density = self.options.tag_density
+        count = int(density) + (self.random.random() < density % 1)
+        if not count:
+            return ''
+        return '{}{}\n'.format(indent, ' '.join(
+            '@{}'.format(self.random.choice(WORDS)) for _ in range(count)))
+
+    def table(self, width, rows, indent):
+        lines = []
+        for _ in range(rows):
+            lines.append('{}| {} |\n'.format(indent, ' | '.join(
+                self.random.choice(WORDS) for _ in range(width))))
+        return ''.join(lines)
+
+    def docstring(self, indent):
+        body = ''.join('{}{}\n'.format(indent, self.words(8))
+                       for _ in range(self.options.docstring_lines))
+        return '{0}"""\n{1}{0}"""\n'.format(indent, body)
+
+    def steps(self, placeholders=()):
+        options = self.options
+        lines = []
+        for index in range(options.steps):
+            title = '{} {}'.format(
+                self.keywords['given'] if not index else self.words(1),
+                self.words(4))
+            if placeholders:
+                title += ' <{}>'.format(placeholders[index % len(placeholders)])
+            if index == 1 and options.table_rows:
+                lines.append('    {}:\n'.format(title))
+                lines.append(self.table(
+                    options.table_width, options.table_rows, '      '))
+            elif index == 2 and options.docstring_lines:
+                lines.append('    {}:\n'.format(title))
+                lines.append(self.docstring('      '))
+            else:
+                lines.append('    {}\n'.format(title))
+        return ''.join(lines)
+
+    def scenario(self, index):
+        options = self.options
+        keywords = self.keywords
+        if options.outline_rows and index % 4 == 3:
+            columns = ['c{}'.format(i) for i in range(options.table_width)]
+            return '{}  {}: {} {}\n{}  {}:\n    | {} |\n{}\n'.format(
+                self.tags('  '), keywords['scenario_outline'], self.words(3),
+                index, self.steps(columns), keywords['examples'],
+                ' | '.join(columns),
+                self.table(options.table_width, options.outline_rows, '    '))
+        return '{}  {}: {} {}\n{}\n'.format(
+            self.tags('  '), keywords['scenario'], self.words(3), index,
+            self.steps())
+
+    def feature(self, index=0):
+        "Returns the text of a whole feature"
+        header = ''
+        if self.options.language != 'en':
+            header = '# language: {}\n'.format(self.options.language)
+        return '{}{}{}: {} {}\n  {}\n\n  {}:\n    {} {}\n\n{}'.format(
+            header, self.tags(''), self.keywords['feature'], self.words(2),
+            index, self.words(8), self.keywords['background'],
+            self.keywords['given'], self.words(4),
+            ''.join(self.scenario(i) for i in range(self.options.scenarios)))
+
+
+def generate(options):
+    "Returns the text of a feature generated with `options'"
+    return Generator(options).feature()
+
+
+def add_arguments(parser):
+    "Adds the options of the generator to an `argparse' parser"
+    defaults = Options()
+    for name, value in sorted(defaults.to_dict().items()):
+        parser.add_argument(
+            '--' + name.replace('_', '-'), type=type(value), default=value,
+            metavar=name.upper())
+
+
+def options_from(args):
+    return Options(**dict((name, getattr(args, name))
+                          for name in Options().to_dict()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    sys.stdout.write(generate(options_from(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
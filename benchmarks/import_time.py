@@ -0,0 +1,85 @@
+# -*- coding: utf-8; -*-
+"""Shows how long importing the parser takes
+
+Imports are measured with `python -X importtime` in fresh processes,
+after a first run that writes the bytecode to a temporary directory so
+only the import itself is counted. Compiling the keywords of every
+language, which used to happen on import, is measured apart. Run it from
+the root of the repository:
+
+    $ python -m benchmarks.import_time
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+MODULES = ('gherkin', 'gherkin.parser', 'gherkin.languages', 're')
+
+COMPILE_ALL = '''\
+import time
+import gherkin.parser
+started = time.perf_counter()
+for language in gherkin.parser.LANGUAGES:
+    gherkin.parser.LANGUAGES[language]
+    gherkin.parser.get_keywords(language)
+print(int((time.perf_counter() - started) * 1e6))
+'''
+
+
+def run(code, env, *options):
+    return subprocess.run(
+        [sys.executable] + list(options) + ['-c', code],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+
+
+def import_times(env):
+    "Returns the cumulative import time of each module, in microseconds"
+    output = run('import gherkin', env, '-X', 'importtime').stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--runs', type=int, default=20,
+        help='number of processes to measure (default: 20)')
+    args = parser.parse_args()
+
+    cache = tempfile.mkdtemp()
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.getcwd()] + [p for p in [env.get('PYTHONPATH')] if p])
+    try:
+        run('import gherkin', env)  # Writes the bytecode
+        samples = [import_times(env) for _ in range(args.runs)]
+        compile_all = [int(run(COMPILE_ALL, env).stdout)
+                       for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(cache)
+
+    print('{:>34} {:>10}'.format('best of {} runs'.format(args.runs), 'usec'))
+    for module in MODULES:
+        times = [sample[module] for sample in samples if module in sample]
+        if times:
+            print('{:>34} {:>10}'.format(
+                'import ' + module, min(times)))
+    print('{:>34} {:>10}'.format(
+        'compiling every language', min(compile_all)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8; -*-
+"""Shows how lexing time grows with the size of the input
+
+Each input is made of scenarios with big multi line strings, which is
+the worst case for docstring detection. Run it from the root of the
+repository:
+
+    $ python -m benchmarks.lexer_scaling
+"""
+
+import argparse
+import time
+
+import gherkin
+
+
+SCENARIO = '''\
+  Scenario: Send a big email
+    Given the following email template:
+      """
+{body}
+      """
+    When I send it
+    Then it's delivered
+'''
+
+BODY_LINE = '      Lorem ipsum dolor sit amet, "consectetur" adipiscing elit\n'
+
+
+def build_document(size):
+    "Returns a feature with roughly `size' characters"
+    scenario = SCENARIO.format(body=BODY_LINE * 20)
+    count = max(1, size // len(scenario))
+    return 'Feature: Scaling\n' + scenario * count
+
+
+def measure(lexer, document):
+    started = time.perf_counter()
+    gherkin.LEXERS[lexer](document).run()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--max-size', type=int, default=10 * 1024 * 1024,
+        help='biggest input size in bytes (default: 10MB)')
+    parser.add_argument(
+        '--lexer', action='append', choices=sorted(gherkin.LEXERS),
+        help='lexer engine to measure (default: all of them)')
+    args = parser.parse_args()
+
+    print('{:>8} {:>10} {:>10} {:>12}'.format(
+        'lexer', 'size', 'seconds', 'usec/KB'))
+    size = 1024
+    while size <= args.max_size:
+        document = build_document(size)
+        for lexer in args.lexer or sorted(gherkin.LEXERS):
+            elapsed = measure(lexer, document)
+            print('{:>8} {:>10} {:>10.4f} {:>12.2f}'.format(
+                lexer, len(document), elapsed,
+                elapsed * 1e6 / (len(document) / 1024.0)))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
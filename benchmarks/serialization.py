@@ -0,0 +1,49 @@
+# -*- coding: utf-8; -*-
+"""Compares the binary encoding of features with pickle
+
+Features of a synthetic corpus are encoded and decoded both ways, and
+the best time of a few runs is kept:
+
+    $ python -m benchmarks.serialization --scenarios 500
+"""
+
+import argparse
+import pickle
+import timeit
+
+import gherkin
+from gherkin import serialize
+
+from . import corpus
+
+
+def best_time(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    corpus.add_arguments(parser)
+    parser.add_argument(
+        '--repeat', type=int, default=20,
+        help='runs of each measurement, the best one is kept (default: 20)')
+    args = parser.parse_args()
+
+    feature = gherkin.parse(corpus.generate(corpus.options_from(args)))
+    engines = (
+        ('pickle', lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+         pickle.loads),
+        ('binary', serialize.dumps, serialize.loads),
+    )
+    print('{:>8} {:>10} {:>12} {:>12}'.format(
+        'format', 'bytes', 'dump usec', 'load usec'))
+    for name, dumps, loads in engines:
+        data = dumps(feature)
+        print('{:>8} {:>10} {:>12.1f} {:>12.1f}'.format(
+            name, len(data),
+            best_time(lambda: dumps(feature), args.repeat) * 1e6,
+            best_time(lambda: loads(data), args.repeat) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
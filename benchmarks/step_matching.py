@@ -0,0 +1,112 @@
+# -*- coding: utf-8; -*-
+"""Measures matching steps against step definitions
+
+Synthetic definitions and steps are matched with `gherkin.steps' and,
+on a sample, by trying every pattern on every step:
+
+    $ python -m benchmarks.step_matching --steps 1000000 --definitions 2000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from gherkin.steps import StepRegistry
+
+from .corpus import WORDS
+
+
+TEMPLATES = (
+    (r'the {0} of the {1} is (\d+) {2}s', 'the {0} of the {1} is {n} {2}s'),
+    (r'I (\w+) the {0} "([^"]*)" to the {1} {2}',
+     'I {w} the {0} "{w}" to the {1} {2}'),
+    (r'(?:a|an|the) {0} with (\d+) {1} and (\d+) {2}',
+     'the {0} with {n} {1} and {n} {2}'),
+    (r'{0} {1} {2} should be (visible|hidden)', '{0} {1} {2} should be hidden'),
+)
+
+
+def definitions(count, rng):
+    "Returns `count' (pattern, example) pairs of different definitions"
+    combinations = [(a, b, c) for a in WORDS for b in WORDS for c in WORDS]
+    rng.shuffle(combinations)
+    pairs = []
+    for index in range(count):
+        pattern, example = TEMPLATES[index % len(TEMPLATES)]
+        words = combinations[index // len(TEMPLATES)]
+        pairs.append((pattern.format(*words), example.format(
+            *words, n='{n}', w='{w}')))
+    return pairs
+
+
+def steps(count, distinct, examples, rng):
+    "Returns `count' step titles drawn from `distinct' different ones"
+    titles = []
+    for _ in range(distinct):
+        if rng.random() < 0.05:
+            titles.append('Then nobody defined this {}'.format(rng.random()))
+        else:
+            titles.append('Given ' + rng.choice(examples).format(
+                n=rng.randrange(100), w=rng.choice(WORDS)))
+    return [rng.choice(titles) for _ in range(count)]
+
+
+def naive(patterns, text):
+    for pattern in patterns:
+        match = pattern.fullmatch(text)
+        if match is not None:
+            return match
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=50000,
+                        help='different step titles among the steps')
+    parser.add_argument('--definitions', type=int, default=2000)
+    parser.add_argument('--sample', type=int, default=2000,
+                        help='steps matched the naive way')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pairs = definitions(args.definitions, rng)
+    titles = steps(args.steps, args.distinct, [e for (_, e) in pairs], rng)
+
+    registry = StepRegistry()
+    started = time.perf_counter()
+    for pattern, _ in pairs:
+        registry.add(pattern)
+    registry.build()
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    text, match = registry.text, registry.match
+    undefined = sum(1 for title in titles if match(text(title)) is None)
+    elapsed = time.perf_counter() - started
+    print('index: {} definitions in {:.2f}s'.format(len(pairs), built))
+    print('index: {} steps ({} distinct, {} undefined) in {:.2f}s, '
+          '{:.0f} steps/s'.format(len(titles), len(registry.matches),
+                                  undefined, elapsed, len(titles) / elapsed))
+
+    # Every title of the sample is a different one, nothing to remember
+    patterns = [re.compile(pattern) for (pattern, _) in pairs]
+    sample = [registry.text(title) for title in set(titles[:args.sample])]
+    started = time.perf_counter()
+    for text in sample:
+        naive(patterns, text)
+    elapsed = time.perf_counter() - started
+
+    registry.matches.clear()
+    started = time.perf_counter()
+    for text in sample:
+        registry.match(text)
+    indexed = time.perf_counter() - started
+    print('distinct steps: naive {:.0f} steps/s, index {:.0f} steps/s'.format(
+        len(sample) / elapsed, len(sample) / indexed))
+
+
+if __name__ == '__main__':
+    main()
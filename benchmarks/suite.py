@@ -0,0 +1,142 @@
+# -*- coding: utf-8; -*-
+"""Measures lexing and parsing of a synthetic corpus
+
+Lexing and parsing are timed apart, and their peak memory is measured in
+separate runs so tracing doesn't skew the timings.  Results can be saved
+as JSON and compared with the ones of another commit:
+
+    $ python -m benchmarks.suite --scenarios 2000 --json before.json
+    $ git checkout my-branch
+    $ python -m benchmarks.suite --scenarios 2000 --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import gherkin
+
+from . import corpus
+
+
+RESULTS_VERSION = 1
+
+METRICS = (
+    # name, unit, whether bigger is better
+    ('lex_seconds', 's', False),
+    ('parse_seconds', 's', False),
+    ('tokens_per_second', 'tok/s', True),
+    ('lex_peak_bytes', 'B', False),
+    ('parse_peak_bytes', 'B', False),
+)
+
+
+def best_time(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def peak_memory(function):
+    "Returns the peak of memory allocated while `function' runs"
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def measure(text, lexer, repeat):
+    tokens = gherkin.tokenize(text, lexer)
+    lex_seconds = best_time(lambda: gherkin.tokenize(text, lexer), repeat)
+    parse_seconds = best_time(
+        lambda: gherkin.Parser(tokens).parse_feature(), repeat)
+    return {
+        'tokens': len(tokens),
+        'lex_seconds': lex_seconds,
+        'parse_seconds': parse_seconds,
+        'tokens_per_second': len(tokens) / lex_seconds,
+        'lex_peak_bytes': peak_memory(lambda: gherkin.tokenize(text, lexer)),
+        'parse_peak_bytes': peak_memory(
+            lambda: gherkin.Parser(tokens).parse_feature()),
+    }
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    "Prints how each metric changed since the `previous' results"
+    if previous.get('options') != results['options']:
+        sys.stderr.write('warning: results were taken with other options\n')
+    print('{:>8} {:>18} {:>14} {:>14} {:>8}'.format(
+        'lexer', 'metric', previous.get('commit') or 'before',
+        results['commit'] or 'after', 'change'))
+    for lexer, metrics in sorted(results['lexers'].items()):
+        before = previous['lexers'].get(lexer)
+        if before is None:
+            continue
+        for name, unit, bigger_is_better in METRICS:
+            old, new = before[name], metrics[name]
+            change = (new - old) / old * 100 if old else 0.0
+            better = (change > 0) == bigger_is_better
+            print('{:>8} {:>18} {:>14.6g} {:>14.6g} {:>+7.1f}% {}'.format(
+                lexer, name, old, new, change,
+                '' if abs(change) < 5 else ('better' if better else 'worse')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    corpus.add_arguments(parser)
+    parser.add_argument(
+        '--lexer', action='append', choices=sorted(gherkin.LEXERS),
+        help='lexer engine to measure (default: all of them)')
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='runs of each measurement, the best one is kept (default: 5)')
+    parser.add_argument('--json', metavar='FILE', help='save the results here')
+    parser.add_argument(
+        '--compare', metavar='FILE', help='compare with results saved before')
+    args = parser.parse_args()
+
+    options = corpus.options_from(args)
+    text = corpus.generate(options)
+    results = {
+        'version': RESULTS_VERSION,
+        'commit': commit(),
+        'python': platform.python_version(),
+        'options': options.to_dict(),
+        'bytes': len(text.encode('utf-8')),
+        'lexers': dict((lexer, measure(text, lexer, args.repeat))
+                       for lexer in args.lexer or sorted(gherkin.LEXERS)),
+    }
+
+    if args.json:
+        with open(args.json, 'w') as fileobj:
+            json.dump(results, fileobj, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fileobj:
+            compare(results, json.load(fileobj))
+    else:
+        print('{} bytes, {} tokens'.format(
+            results['bytes'], results['lexers'][min(results['lexers'])]['tokens']))
+        print('{:>8} {:>18} {:>14}'.format('lexer', 'metric', 'value'))
+        for lexer, metrics in sorted(results['lexers'].items()):
+            for name, unit, _ in METRICS:
+                print('{:>8} {:>18} {:>14.6g} {}'.format(
+                    lexer, name, metrics[name], unit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+__version__ = '0.1.0'
+
+from .parser import (
+    TOKEN_EOF,
+    TOKEN_NEWLINE,
+    TOKEN_TEXT,
+    TOKEN_COMMENT,
+    TOKEN_META_LABEL,
+    TOKEN_META_VALUE,
+    TOKEN_LABEL,
+    TOKEN_TABLE_COLUMN,
+    TOKEN_QUOTES,
+    TOKEN_TAG,
+    LEXERS,
+    DEFAULT_LEXER,
+    Lexer,
+    ScannerLexer,
+    Span,
+    TokenBuffer,
+    TokenWindow,
+    Parser,
+    Diagnostic,
+    Skimmer,
+    Ast,
+    Keywords,
+    get_keywords,
+    get_lexer,
+    tokenize,
+    parse,
+    skim,
+    parse_stream,
+    parse_file,
+)
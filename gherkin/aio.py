@@ -0,0 +1,119 @@
+# -*- coding: utf-8; -*-
+"""Parses features from asyncio code without blocking the event loop
+
+    feature = await aio.parse_file('features/login.feature')
+
+    async for result in aio.parse_tree('features/', concurrency=8):
+        print(result.path, result.error or result.feature.title)
+
+Files are read in the default executor of the loop, which is as close
+to non blocking I/O as files get, and lexing and parsing happen in the
+`executor' given (the default one of the loop when there's none).  With
+a process pool, features come back from the workers in the binary
+encoding of `gherkin.serialize', like they do in `gherkin.bulk'.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+
+from . import serialize
+from .bulk import Result
+from .files import find_features
+from .parser import DEFAULT_LEXER, parse as parse_text
+
+
+DEFAULT_CONCURRENCY = 16  # Files read and parsed at the same time
+
+
+def parse_data(data, lexer=DEFAULT_LEXER, encoding='utf-8'):
+    "Parses the text of a feature, decoding it first when it's bytes"
+    if isinstance(data, bytes):
+        data = data.decode(encoding)
+    return parse_text(data, lexer)
+
+
+def parse_encoded(data, lexer=DEFAULT_LEXER, encoding='utf-8'):
+    "Same as parse_data() but returns the feature encoded by `gherkin.serialize'"
+    return serialize.dumps(parse_data(data, lexer, encoding))
+
+
+def read_bytes(path):
+    with open(path, 'rb') as fileobj:
+        return fileobj.read()
+
+
+async def parse(data, lexer=DEFAULT_LEXER, encoding='utf-8', executor=None):
+    "Parses the text or bytes of a feature in `executor'"
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        encoded = await loop.run_in_executor(
+            executor, parse_encoded, data, lexer, encoding)
+        return serialize.loads(encoded)
+    return await loop.run_in_executor(
+        executor, parse_data, data, lexer, encoding)
+
+
+async def parse_file(path, lexer=DEFAULT_LEXER, encoding='utf-8',
+                     executor=None):
+    "Reads and parses the file found at `path'"
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(None, read_bytes, path)
+    return await parse(data, lexer, encoding, executor)
+
+
+async def parse_reader(reader, lexer=DEFAULT_LEXER, encoding='utf-8',
+                       executor=None):
+    "Parses everything an `asyncio.StreamReader' has until its end"
+    return await parse(await reader.read(), lexer, encoding, executor)
+
+
+async def parse_one(path, lexer=DEFAULT_LEXER, encoding='utf-8',
+                    executor=None):
+    "Same as parse_file(), but returns a `gherkin.bulk.Result' instead of raising"
+    try:
+        return Result(path, feature=await parse_file(
+            path, lexer, encoding, executor))
+    except Exception as error:
+        return Result(path, error='{}: {}'.format(
+            error.__class__.__name__, error))
+
+
+async def parse_paths(paths, concurrency=DEFAULT_CONCURRENCY,
+                      lexer=DEFAULT_LEXER, encoding='utf-8', executor=None):
+    """Yields one `gherkin.bulk.Result' per path, as soon as each one is ready
+
+    No more than `concurrency' files are read and parsed at the same
+    time, and paths are only taken from `paths' when there's room for
+    them, so it can be a generator of any size.  Files still being
+    parsed are cancelled when the iteration stops early.
+    """
+    if concurrency < 1:
+        raise ValueError('Concurrency must be at least 1')
+    paths = iter(paths)
+    pending = set()
+    try:
+        while True:
+            for path in paths:
+                pending.add(asyncio.ensure_future(
+                    parse_one(path, lexer, encoding, executor)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def parse_tree(root, concurrency=DEFAULT_CONCURRENCY,
+                     lexer=DEFAULT_LEXER, encoding='utf-8', executor=None):
+    "Yields one `gherkin.bulk.Result' per feature file found under `root'"
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(None, find_features, root)
+    async for result in parse_paths(
+            paths, concurrency, lexer, encoding, executor):
+        yield result
@@ -0,0 +1,245 @@
+# -*- coding: utf-8; -*-
+"""Parses whole directory trees of feature files across processes
+
+    $ python -m gherkin.bulk features/ --workers 4 --index tags.json
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import os
+import sys
+import time
+
+from . import serialize
+from .cache import DEFAULT_MAX_SIZE, ParseCache
+from .files import find_features
+from .instrument import Profile, format_report
+from .interning import Interner, format_report as format_interning
+from .parser import DEFAULT_LEXER, LEXERS, parse_file
+from .tags import TagIndex
+from .usage import StepUsage
+
+
+DEFAULT_BATCH_SIZE = 256 * 1024  # Bytes of feature files per task
+
+
+class Result(object):
+    """What came out of parsing one file: either a `feature' or an `error'
+
+    Files parsed recovering from errors have a feature, which might be
+    partial, and the `diagnostics' of everything wrong with them.
+    """
+
+    def __init__(self, path, feature=None, error=None, cached=None,
+                 profile=None, diagnostics=None):
+        self.path = path
+        self.feature = feature
+        self.error = error
+        self.cached = cached  # None when no cache was used
+        self.profile = profile  # Report of `gherkin.instrument', if asked
+        self.diagnostics = diagnostics  # None unless recovering from errors
+
+    def __repr__(self):
+        return 'Result(path={!r}, feature={!r}, error={!r}, cached={!r})'.format(
+            self.path, self.feature, self.error, self.cached)
+
+    def __getstate__(self):
+        # Results travel back from the worker processes, and features are
+        # smaller and quicker to move around in their binary encoding
+        state = dict(self.__dict__)
+        if self.feature is not None:
+            state['feature'] = serialize.dumps(self.feature)
+        return state
+
+    def __setstate__(self, state):
+        if state['feature'] is not None:
+            state['feature'] = serialize.loads(state['feature'])
+        self.__dict__.update(state)
+
+
+def batches(paths, batch_size=DEFAULT_BATCH_SIZE):
+    "Groups `paths' so each group holds about `batch_size' bytes of files"
+    batch, size = [], 0
+    for path in paths:
+        batch.append(path)
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass  # Gone or unreadable, parse_one() reports it
+        if size >= batch_size:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def parse_one(path, lexer=DEFAULT_LEXER, cache=None, profile=False,
+              interner=None, recover=False):
+    """Parses a single file, capturing any error instead of raising it
+
+    When `profile' is true the file is always parsed, skipping the
+    cache, and the report of its `gherkin.instrument.Profile' is kept
+    in the result.  Strings are shared through `interner', a
+    `gherkin.interning.Interner', when one is given.
+
+    With `recover', syntax errors end up in the `diagnostics' of the
+    result instead, all of them.  Diagnostics aren't cached, so the
+    file is always parsed as well.
+    """
+    diagnostics = [] if recover else None
+    try:
+        if profile:
+            instrument = Profile()
+            feature = parse_file(path, lexer, profile=instrument,
+                                 interner=interner, diagnostics=diagnostics)
+            return Result(path, feature=feature, profile=instrument.report(),
+                          diagnostics=diagnostics)
+        if cache is None or recover:
+            feature = parse_file(
+                path, lexer, interner=interner, diagnostics=diagnostics)
+            return Result(path, feature=feature, diagnostics=diagnostics)
+        hits = cache.hits
+        feature = cache.parse_file(path, lexer)
+        if interner is not None:
+            interner.feature(feature)
+        return Result(path, feature=feature, cached=cache.hits > hits)
+    except Exception as error:
+        return Result(path, error='{}: {}'.format(
+            error.__class__.__name__, error))
+
+
+def parse_batch(paths, lexer=DEFAULT_LEXER, cache=None, profile=False,
+                recover=False):
+    return [parse_one(path, lexer, cache, profile, recover=recover)
+            for path in paths]
+
+
+def parse_paths(paths, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                lexer=DEFAULT_LEXER, cache=None, profile=False, interner=None,
+                recover=False):
+    """Yields one `Result' per path, in the same order of `paths'
+
+    Files are grouped in batches of about `batch_size' bytes that are
+    parsed by a pool of `workers' processes (one per CPU by default).
+    With a single worker everything happens in the current process.
+
+    When a `gherkin.cache.ParseCache' is given, unchanged files are
+    loaded from it and its counters are updated as results arrive.
+
+    With `profile', each result carries the instrumentation report of
+    its file; `gherkin.instrument.Profile.merge()' adds them up.
+
+    All the features share the strings of `interner' when one is given.
+    Features parsed by other processes are interned as they arrive.
+
+    With `recover', every syntax error of a file is reported in the
+    `diagnostics' of its result, along with its partial feature.
+    """
+    if workers == 1:
+        for path in paths:
+            yield parse_one(path, lexer, cache, profile, interner, recover)
+        return
+
+    task = functools.partial(parse_batch, lexer=lexer, cache=cache,
+                             profile=profile, recover=recover)
+    with ProcessPoolExecutor(workers) as executor:
+        for results in executor.map(task, batches(paths, batch_size)):
+            for result in results:
+                if interner is not None and result.feature is not None:
+                    interner.feature(result.feature)
+                if result.cached is not None:
+                    if result.cached:
+                        cache.hits += 1
+                    else:
+                        cache.misses += 1
+                yield result
+
+
+def parse_tree(root, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+               lexer=DEFAULT_LEXER, cache=None, profile=False, interner=None,
+               recover=False):
+    "Yields one `Result' per feature file found under `root'"
+    return parse_paths(find_features(root), workers, batch_size, lexer,
+                       cache, profile, interner, recover)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m gherkin.bulk',
+        description='Parses all the feature files under a directory')
+    parser.add_argument('root', help='directory to look for .feature files')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=None,
+        help='number of processes (default: one per CPU)')
+    parser.add_argument(
+        '-b', '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+        help='bytes of feature files sent to a process at once')
+    parser.add_argument(
+        '-l', '--lexer', choices=sorted(LEXERS), default=DEFAULT_LEXER)
+    parser.add_argument(
+        '-c', '--cache', metavar='DIRECTORY',
+        help='keep parsed features in this directory across runs')
+    parser.add_argument(
+        '--cache-size', type=int, default=DEFAULT_MAX_SIZE,
+        help='maximum size of the cache directory in bytes')
+    parser.add_argument(
+        '-i', '--index', metavar='FILE',
+        help='write the tag index of the scenarios found to this file')
+    parser.add_argument(
+        '-u', '--usage', metavar='FILE',
+        help='write how often and where each step is used to this file')
+    parser.add_argument(
+        '-p', '--profile', action='store_true',
+        help='report calls and time of each lexer state and parser production')
+    parser.add_argument(
+        '--intern', action='store_true',
+        help='share repeated strings across features and report the savings')
+    parser.add_argument(
+        '-r', '--recover', action='store_true',
+        help='report every syntax error of each file, not just the first one')
+    args = parser.parse_args(argv)
+
+    cache = ParseCache(args.cache, args.cache_size) if args.cache else None
+    index = TagIndex() if args.index else None
+    usage = StepUsage() if args.usage else None
+    profile = Profile() if args.profile else None
+    interner = Interner() if args.intern else None
+    started = time.perf_counter()
+    count = errors = 0
+    for result in parse_tree(args.root, args.workers, args.batch_size,
+                             args.lexer, cache, args.profile, interner,
+                             args.recover):
+        count += 1
+        if result.profile is not None:
+            profile.merge(result.profile)
+        if result.error is not None:
+            errors += 1
+            sys.stderr.write('{}: {}\n'.format(result.path, result.error))
+        else:
+            if result.diagnostics:
+                errors += 1
+                for diagnostic in result.diagnostics:
+                    sys.stderr.write('{}:{}\n'.format(result.path, diagnostic))
+            if index is not None:
+                index.add(result.path, result.feature)
+            if usage is not None:
+                usage.add(result.path, result.feature)
+    sys.stdout.write('Parsed {} files ({} errors) in {:.2f}s\n'.format(
+        count, errors, time.perf_counter() - started))
+    if cache is not None:
+        sys.stdout.write('Cache: {} hits, {} misses\n'.format(
+            cache.hits, cache.misses))
+    if index is not None:
+        index.save(args.index)
+    if usage is not None:
+        usage.save(args.usage)
+    if profile is not None:
+        sys.stdout.write('{}\n'.format(format_report(profile.report())))
+    if interner is not None:
+        sys.stdout.write('{}\n'.format(format_interning(interner.report())))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8; -*-
+"""Keeps parsed features on disk so unchanged files aren't parsed again
+
+Entries are keyed by the content of the file and the encoding it's read
+with, the version of the parser, the keyword tables and the version of
+the encoding of the features (see `gherkin.serialize'), so any of them
+changing invalidates the entry.
+"""
+
+import codecs
+import hashlib
+import io
+import os
+import tempfile
+
+from . import __version__, languages, serialize
+from .parser import DEFAULT_LEXER, parse_stream
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+SUFFIX = '.ast'
+
+
+def languages_hash():
+    "Returns a hash of the keyword tables the parser relies on"
+    table = sorted((name, sorted(keywords.items()))
+                   for (name, keywords) in languages.LANGUAGES.items())
+    return hashlib.sha1(repr(table).encode('utf-8')).hexdigest()
+
+
+class ParseCache(object):
+    """A directory of encoded `Ast.Feature' trees with size based LRU eviction
+
+    Each hit refreshes the modification time of its entry, and when the
+    directory grows over `max_size' bytes the entries that weren't used
+    for the longest time are removed.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.size = None  # Only computed when something is stored
+        self.salt = '{}:{}:{}'.format(
+            __version__, languages_hash(),
+            serialize.FORMAT_VERSION).encode('utf-8')
+
+    def key(self, content, encoding='utf-8'):
+        "Returns the key of `content' (bytes) decoded with `encoding'"
+        encoding = codecs.lookup(encoding).name.encode('ascii')
+        return hashlib.sha1(
+            self.salt + b':' + encoding + b':' + content).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + SUFFIX)
+
+    def get(self, content, encoding='utf-8'):
+        "Returns the feature stored for `content' or None"
+        path = self.path(self.key(content, encoding))
+        try:
+            with open(path, 'rb') as fileobj:
+                feature = serialize.loads(fileobj.read())
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass  # Evicted by someone else in the meantime
+        return feature
+
+    def put(self, content, feature, encoding='utf-8'):
+        "Stores `feature' as the parsed version of `content'"
+        path = self.path(self.key(content, encoding))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Written aside and moved in place so readers never see half an entry
+        fd, temp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as fileobj:
+            fileobj.write(serialize.dumps(feature))
+            written = fileobj.tell()
+        try:
+            written -= os.path.getsize(path)  # Replacing an entry
+        except OSError:
+            pass
+        os.replace(temp, path)
+
+        if self.size is None:
+            self.size = self.disk_usage()
+        else:
+            self.size += written
+        if self.size > self.max_size:
+            self.evict()
+
+    def entries(self):
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith(SUFFIX):
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    yield info.st_mtime, info.st_size, path
+
+    def disk_usage(self):
+        return sum(size for (_, size, _) in self.entries())
+
+    def evict(self):
+        "Removes the least recently used entries until there's room again"
+        entries = sorted(self.entries())
+        self.size = sum(size for (_, size, _) in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.size -= size
+
+    def parse(self, content, lexer=DEFAULT_LEXER, encoding='utf-8'):
+        "Returns the feature found in `content' (bytes), parsing it on misses"
+        feature = self.get(content, encoding)
+        if feature is not None:
+            self.hits += 1
+            return feature
+        self.misses += 1
+        feature = parse_stream(io.BytesIO(content), lexer, encoding)
+        self.put(content, feature, encoding)
+        return feature
+
+    def parse_file(self, path, lexer=DEFAULT_LEXER, encoding='utf-8'):
+        with open(path, 'rb') as fileobj:
+            return self.parse(fileobj.read(), lexer, encoding)
@@ -0,0 +1,15 @@
+# -*- coding: utf-8; -*-
+"""Finds feature files, for tools that have no use for `gherkin.bulk'"""
+
+import os
+
+
+def find_features(root, extension='.feature'):
+    "Returns the paths of all the feature files under `root' in a stable order"
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(extension):
+                paths.append(os.path.join(dirpath, filename))
+    return paths
@@ -0,0 +1,276 @@
+# -*- coding: utf-8; -*-
+"""Writes features back as canonical Gherkin
+
+    $ python -m gherkin.formatter features/
+    $ python -m gherkin.formatter --check features/login.feature
+
+Features are written a line at a time to a file object, with two spaces
+of indentation per level, a blank line between scenarios and the columns
+of tables aligned.  Multi line strings are moved along with their
+quotes, keeping the indentation of their lines relative to the closing
+quotes, since it's part of their text.
+
+The header comments of a file, like `# language: pt-br', aren't part of
+the `Ast.Feature', so they're taken from the tokens of the source and
+written before it.  Comments aren't allowed anywhere else.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+from .files import find_features
+from .languages import keyword
+from .parser import (
+    DEFAULT_LEXER,
+    LEXERS,
+    TOKEN_COMMENT,
+    TOKEN_META_LABEL,
+    TOKEN_META_VALUE,
+    TOKEN_NEWLINE,
+    Ast,
+    get_lexer,
+    parse,
+)
+
+
+INDENT = '  '
+
+
+def read_header(text, lexer=DEFAULT_LEXER):
+    """Returns the comment lines before the feature in `text' and its language
+
+    Only the tokens of the header are read, and the comments are taken
+    from the lines they were found in, since the ones with a colon are
+    split into a label and a value.
+    """
+    numbers = []
+    language = 'en'
+    label = None
+    for line, token, value in get_lexer(text, lexer).iter_tokens():
+        if token in (TOKEN_COMMENT, TOKEN_META_LABEL):
+            if not numbers or numbers[-1] != line:
+                numbers.append(line)
+            label = value
+        elif token == TOKEN_META_VALUE:
+            if label.strip() == 'language':
+                language = value.strip()
+        elif token != TOKEN_NEWLINE:
+            break
+    lines = text.split('\n', numbers[-1]) if numbers else []
+    return [lines[number - 1].strip() for number in numbers], language
+
+
+class Formatter(object):
+    "Yields the lines of a feature written in `language'"
+
+    def __init__(self, language='en', header=()):
+        self.header = header
+        self.keywords = dict(
+            (kind, keyword(language, kind))
+            for kind in ('feature', 'background', 'scenario',
+                         'scenario_outline', 'examples'))
+
+    def lines(self, feature):
+        for line in self.header:
+            yield line + '\n'
+        if self.header:
+            yield '\n'
+        for line in self.tags(feature.tags, ''):
+            yield line
+        yield self.label('feature', feature.title, '')
+        for line in self.description(feature.description, INDENT):
+            yield line
+        if feature.background is not None:
+            yield '\n'
+            yield self.label('background', feature.background.title, INDENT)
+            for line in self.steps(feature.background.steps):
+                yield line
+        for scenario in feature.scenarios:
+            yield '\n'
+            for line in self.scenario(scenario):
+                yield line
+
+    def scenario(self, scenario):
+        for line in self.tags(scenario.tags, INDENT):
+            yield line
+        outline = isinstance(scenario, Ast.ScenarioOutline)
+        yield self.label(
+            'scenario_outline' if outline else 'scenario',
+            scenario.title, INDENT)
+        for line in self.description(scenario.description, INDENT * 2):
+            yield line
+        for line in self.steps(scenario.steps):
+            yield line
+        examples = scenario.examples if outline else None
+        if examples is not None:
+            yield '\n'
+            for line in self.tags(examples.tags, INDENT * 2):
+                yield line
+            yield self.label('examples', None, INDENT * 2)
+            for line in self.table(examples.table, INDENT * 3):
+                yield line
+
+    def label(self, kind, title, indent):
+        if title is None or not title.text.strip():
+            return '{}{}:\n'.format(indent, self.keywords[kind])
+        return '{}{}: {}\n'.format(
+            indent, self.keywords[kind], title.text.strip())
+
+    def tags(self, tags, indent):
+        if tags:
+            yield '{}{}\n'.format(indent, ' '.join('@' + tag for tag in tags))
+
+    def description(self, description, indent):
+        if description is not None:
+            yield '{}{}\n'.format(indent, description.text.strip())
+
+    def steps(self, steps):
+        indent = INDENT * 2
+        for step in steps:
+            title = step.title.text.strip()
+            if step.table is None and step.text is None:
+                yield '{}{}\n'.format(indent, title)
+                continue
+            # Steps with data end in a colon, which the parser drops
+            yield '{}{}:\n'.format(indent, title)
+            if step.table is not None:
+                for line in self.table(step.table, INDENT * 3):
+                    yield line
+            if step.text is not None:
+                for line in self.text(step.text, INDENT * 3):
+                    yield line
+
+    def table(self, table, indent):
+        # Blank lines after a table come out as empty rows
+        rows = [row for row in table.fields if row]
+        widths = []
+        for row in rows:
+            for index, value in enumerate(row):
+                if index == len(widths):
+                    widths.append(len(value))
+                elif len(value) > widths[index]:
+                    widths[index] = len(value)
+        for row in rows:
+            yield '{}| {} |\n'.format(indent, ' | '.join(
+                value.ljust(widths[index]) for (index, value) in enumerate(row)))
+
+    def text(self, text, indent):
+        text = text.text
+        start, _, end = text.rpartition('\n')
+        if text.startswith('\n') and not end.strip():
+            # Moved along with the quotes, when all the lines are
+            # indented at least as much as the closing ones
+            lines = start.split('\n')[1:]
+            if all(line.startswith(end) for line in lines if line.strip()):
+                text = ''.join('\n' + (indent + line[len(end):]
+                                       if line.strip() else line)
+                               for line in lines) + '\n' + indent
+        for line in '{}"""{}"""'.format(indent, text).split('\n'):
+            yield line + '\n'
+
+
+def format_feature(feature, fileobj, language='en', header=()):
+    "Writes `feature' to `fileobj' as canonical Gherkin"
+    write = fileobj.write
+    for line in Formatter(language, header).lines(feature):
+        write(line)
+
+
+def format_text(text, lexer=DEFAULT_LEXER):
+    "Returns the canonical version of the Gherkin in `text'"
+    header, language = read_header(text, lexer)
+    output = io.StringIO()
+    format_feature(parse(text, lexer), output, language, header)
+    return output.getvalue()
+
+
+def check(feature, lines, language='en', header=()):
+    """Returns the number of the first one of `lines' that differs from `feature'
+
+    Lines of the canonical version are only produced up to the first
+    difference.  Returns None when `lines' are already canonical.
+    """
+    lines = iter(lines)
+    number = 0
+    for number, expected in enumerate(
+            Formatter(language, header).lines(feature), 1):
+        if next(lines, None) != expected:
+            return number
+    if next(lines, None) is not None:
+        return number + 1
+    return None
+
+
+def read_text(path, encoding='utf-8'):
+    with open(path, encoding=encoding, newline='') as fileobj:
+        return fileobj.read()
+
+
+def write_text(path, feature, language, header, encoding='utf-8'):
+    "Writes `feature' over the file at `path', which never has half a feature"
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as fileobj:
+            format_feature(feature, fileobj, language, header)
+        shutil.copymode(path, temp)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def find_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for found in find_features(path):
+                yield found
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m gherkin.formatter',
+        description='Rewrites feature files as canonical Gherkin')
+    parser.add_argument(
+        'paths', nargs='+', metavar='path',
+        help='feature files, or directories to look for .feature files')
+    parser.add_argument(
+        '--check', action='store_true',
+        help='only report the files that are not canonical, rewriting none')
+    parser.add_argument(
+        '-l', '--lexer', choices=sorted(LEXERS), default=DEFAULT_LEXER)
+    parser.add_argument('-e', '--encoding', default='utf-8')
+    args = parser.parse_args(argv)
+
+    changed = errors = 0
+    for path in find_paths(args.paths):
+        try:
+            text = read_text(path, args.encoding)
+            header, language = read_header(text, args.lexer)
+            feature = parse(text, args.lexer)
+        except (OSError, UnicodeDecodeError, SyntaxError) as error:
+            errors += 1
+            sys.stderr.write('{}: {}: {}\n'.format(
+                path, error.__class__.__name__, error))
+            continue
+        number = check(feature, io.StringIO(text), language, header)
+        if number is None:
+            continue
+        changed += 1
+        if args.check:
+            sys.stdout.write('{}:{}: not formatted\n'.format(path, number))
+        else:
+            write_text(path, feature, language, header, args.encoding)
+            sys.stdout.write('Formatted {}\n'.format(path))
+    if errors:
+        return 2
+    return 1 if args.check and changed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# -*- coding: utf-8; -*-
+"""Keeps a feature parsed while its text is edited
+
+Meant for editors and language servers: after each edit only the lines
+of the scenarios the edit touched are lexed and parsed again, the other
+scenarios are reused as they are.
+"""
+
+from bisect import bisect_right
+
+from .parser import (
+    TOKEN_LABEL,
+    TOKEN_NEWLINE,
+    TOKEN_QUOTES,
+    TOKEN_TABLE_COLUMN,
+    TOKEN_TAG,
+    Ast,
+    Parser,
+    ScannerLexer,
+)
+
+
+def shifted(node, delta):
+    """Returns a copy of `node' and everything under it `delta' lines down
+
+    Nodes handed out by earlier edits are never changed, strings are
+    shared with the copy.
+    """
+    if isinstance(node, list):
+        return [shifted(item, delta) for item in node]
+    if not isinstance(node, Ast.Node):
+        return node
+    copy = node.__class__.__new__(node.__class__)
+    for field in node._fields:
+        value = getattr(node, field)
+        if field == 'line':
+            if value is not None:
+                value += delta
+        else:
+            value = shifted(value, delta)
+        setattr(copy, field, value)
+    return copy
+
+
+def scenario_starts(lines, types, scenarios):
+    """Returns the first line of each scenario, counting the lines of its tags
+
+    Also tells whether all of them start with a tag or a label that would
+    end the steps of the scenario before them; otherwise the scenarios
+    can't be parsed apart from each other.
+    """
+    firsts = {}  # Index of the first token of each line
+    for index, line in enumerate(lines):
+        if line not in firsts:
+            firsts[line] = index
+
+    starts = []
+    separate = True
+    for scenario in scenarios:
+        start = scenario.line
+        index = firsts[scenario.line]
+        if types[index] == TOKEN_LABEL:
+            following = index + 1
+            while following < len(types) and types[following] == TOKEN_NEWLINE:
+                following += 1
+            if following < len(types) and types[following] in (
+                    TOKEN_TABLE_COLUMN, TOKEN_QUOTES):
+                separate = False
+        elif types[index] != TOKEN_TAG:
+            separate = False
+
+        index -= 1
+        while index >= 0 and types[index] in (TOKEN_TAG, TOKEN_NEWLINE):
+            if types[index] == TOKEN_TAG:
+                start = lines[index]
+            index -= 1
+        starts.append(start)
+    return starts, separate
+
+
+def line_start(text, offset, above=0):
+    "Offset of the line `above' lines before the one holding `offset'"
+    start = text.rfind('\n', 0, offset) + 1
+    for _ in range(above):
+        start = text.rfind('\n', 0, start - 1) + 1
+    return start
+
+
+def line_below(text, offset, below):
+    "Offset of the line `below' lines after the one holding `offset'"
+    for _ in range(below):
+        offset = text.find('\n', offset) + 1
+        if not offset:
+            return len(text)
+    return offset
+
+
+class Document(object):
+    """The text of a feature file and its always up to date `Ast.Feature'
+
+    `feature' is None while the text doesn't parse.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.feature = None
+        self.starts = []  # First line of each scenario, including tags
+        self.separate = False  # Whether scenarios can be parsed on their own
+        self.language = None
+        self.reparse()
+
+    def reparse(self):
+        "Parses the whole text again"
+        self.feature = None
+        buffer = ScannerLexer(self.text).run_buffer()
+        parser = Parser(buffer)
+        feature = parser.parse_feature()
+        self.language = parser.language
+        self.starts, self.separate = scenario_starts(
+            buffer.lines, buffer.types, feature.scenarios)
+        self.feature = feature
+        return feature
+
+    def edit(self, start, end, replacement):
+        """Replaces text[start:end] with `replacement' and returns the new feature
+
+        Features returned by earlier edits are left as they were.  The
+        scenarios above the edit are shared with them, and so are the
+        ones below it when the edit doesn't add or remove lines.
+        Otherwise those are copied with their new lines, so such edits
+        also take time in proportion to what's below them, as does
+        building the new text.
+
+        Raises SyntaxError when the new text doesn't parse.
+        """
+        old = self.text
+        first = old.count('\n', 0, start) + 1
+        last = first + old.count('\n', start, end)
+        delta = replacement.count('\n') - (last - first)
+        self.text = old[:start] + replacement + old[end:]
+
+        if (self.feature is None or not self.separate or not self.starts or
+                first <= self.starts[0]):
+            return self.reparse()
+
+        # Scenarios from i to j (inclusive) are parsed again: the ones
+        # touched by the edit, the one after them, which gets any tags the
+        # edit might have left at the end of the others, and the one before
+        # when the first line of a scenario changes, since whatever is left
+        # there might now belong to the previous one
+        starts = self.starts
+        i = bisect_right(starts, first) - 1
+        if i and first == starts[i]:
+            i -= 1
+        j = min(bisect_right(starts, last), len(starts) - 1)
+        # Scenarios sharing a line are never split apart
+        while i and starts[i - 1] == starts[i]:
+            i -= 1
+        while j + 1 < len(starts) and starts[j + 1] == starts[j]:
+            j += 1
+
+        region_start = line_start(self.text, start, first - self.starts[i])
+        if j + 1 < len(self.starts):
+            edit_end = start + len(replacement)
+            edit_end_line = last + delta
+            region_end = line_below(
+                self.text, edit_end,
+                self.starts[j + 1] + delta - edit_end_line)
+        else:
+            region_end = len(self.text)
+
+        scenarios = self.parse_region(
+            self.text[region_start:region_end], self.starts[i] - 1)
+        if scenarios is None:
+            return self.reparse()
+        scenarios, starts = scenarios
+
+        following = self.feature.scenarios[j + 1:]
+        if delta:
+            following = shifted(following, delta)
+        feature = self.feature
+        self.feature = Ast.Feature(
+            line=feature.line,
+            title=feature.title,
+            tags=feature.tags,
+            description=feature.description,
+            background=feature.background,
+            scenarios=feature.scenarios[:i] + scenarios + following)
+        self.starts = (self.starts[:i] + starts +
+                       [line + delta for line in self.starts[j + 1:]])
+        return self.feature
+
+    def parse_region(self, text, shift):
+        """Parses the scenarios found in `text', which starts `shift' lines down
+
+        Returns None when the region can't be parsed on its own.
+        """
+        tokens = [(line + shift, token, value)
+                  for (line, token, value) in ScannerLexer(text).iter_tokens()]
+        types = [token for (_, token, _) in tokens]
+        if types.count(TOKEN_QUOTES) % 2:
+            return None  # A multi line string runs past the region
+        parser = Parser(tokens)
+        parser.set_language(self.language)
+        try:
+            scenarios = parser.parse_scenarios()
+        except SyntaxError:
+            return None
+        lines = [line for (line, _, _) in tokens]
+        starts, separate = scenario_starts(lines, types, scenarios)
+        if not separate:
+            return None
+        return scenarios, starts
@@ -0,0 +1,156 @@
+# -*- coding: utf-8; -*-
+"""Tells where the time goes while lexing and parsing
+
+    >>> profile = Profile()
+    >>> feature = gherkin.parse(text, profile=profile)
+    >>> print(format_report(profile.report()))
+
+Only the lexer and parser of a profiled parse are instrumented, by
+wrapping their methods on the instances themselves, so parsing without
+a profile runs exactly the same code as before.
+"""
+
+import collections
+import time
+
+from . import parser
+
+
+TOKEN_NAMES = dict(
+    (getattr(parser, name), name) for name in dir(parser)
+    if name.startswith('TOKEN_'))
+
+
+## The scanner runs all its states in a single loop, so the time of
+## each one is what its regular expressions take to find the next stop
+SCANNER_STATES = {
+    'whitespaces': 'whitespace',  # Skipped in most states
+    'text_stop': 'text',
+    'comment_stop': 'comment',
+    'field_stop': 'field',
+    'field_value': 'field',
+    'tag_stop': 'tag',
+    'quotes_stop': 'quotes',
+}
+
+
+def productions(cls):
+    "Returns the names of the lexer states and parser productions of `cls'"
+    return sorted(name for name in dir(cls)
+                  if name.startswith(('lex_', 'parse_')) or
+                  name == 'match_label')
+
+
+class Profile(object):
+    """Counts calls and accumulates their time, per lexer state and parser production
+
+    `seconds' includes the time of the calls made from within, while
+    `own_seconds' doesn't.  Tokens are counted by type, and the time
+    the lexer takes to produce them is accounted as `lexer'.  The states
+    of the scanner engine are timed by the searches each one makes,
+    anything else it does is the own time of `lexer'.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.calls = collections.Counter()
+        self.seconds = collections.Counter()
+        self.own_seconds = collections.Counter()
+        self.tokens = collections.Counter()
+        self.stack = []  # Time spent by the children of each running call
+
+    def measure(self, name, function, *args):
+        stack = self.stack
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.calls[name] += 1
+            self.seconds[name] += elapsed
+            self.own_seconds[name] += elapsed - children
+
+    def wrap(self, name, function):
+        measure = self.measure
+
+        def wrapper(*args):
+            return measure(name, function, *args)
+        return wrapper
+
+    def instrument(self, instance):
+        "Wraps the lexer states or parser productions of `instance'"
+        prefix = instance.__class__.__name__
+        for name in productions(instance.__class__):
+            setattr(instance, name, self.wrap(
+                '{}.{}'.format(prefix, name), getattr(instance, name)))
+        if isinstance(instance, parser.ScannerLexer):
+            for name, state in SCANNER_STATES.items():
+                setattr(instance, name, self.wrap(
+                    '{}.{}'.format(prefix, state), getattr(instance, name)))
+        return instance
+
+    def count(self, tokens):
+        "Yields `tokens', counting them and timing how long each takes to come"
+        iterator = iter(tokens)
+        counts = self.tokens
+        while True:
+            try:
+                token = self.measure('lexer', next, iterator)
+            except StopIteration:
+                return
+            counts[TOKEN_NAMES.get(token[1], token[1])] += 1
+            yield token
+
+    def parse(self, lexer, encoding='utf-8', views=False, interner=None,
+              diagnostics=None, lines=None):
+        "Parses the tokens of the `lexer' instance into an `Ast.Feature'"
+        self.instrument(lexer)
+        tokens = parser.get_tokens(lexer, views, interner)
+        instance = self.instrument(parser.Parser(
+            self.count(tokens), encoding, views, diagnostics, lines))
+        self.files += 1
+        return self.measure('parse', instance.parse_feature)
+
+    def report(self):
+        "Returns the counters as plain data, ready to be merged or saved"
+        return {
+            'files': self.files,
+            'functions': dict(
+                (name, {
+                    'calls': self.calls[name],
+                    'seconds': self.seconds[name],
+                    'own_seconds': self.own_seconds[name],
+                }) for name in self.calls),
+            'tokens': dict(self.tokens),
+        }
+
+    def merge(self, report):
+        "Adds the counters of a `report' taken somewhere else, like another process"
+        self.files += report['files']
+        for name, function in report['functions'].items():
+            self.calls[name] += function['calls']
+            self.seconds[name] += function['seconds']
+            self.own_seconds[name] += function['own_seconds']
+        self.tokens.update(report['tokens'])
+
+
+def format_report(report):
+    "Returns a report as a table, slowest functions first"
+    lines = ['{} files, {} tokens'.format(
+        report['files'], sum(report['tokens'].values()))]
+    lines.append('{:>32} {:>10} {:>10} {:>10}'.format(
+        'function', 'calls', 'seconds', 'own'))
+    functions = sorted(report['functions'].items(),
+                       key=lambda item: -item[1]['own_seconds'])
+    for name, function in functions:
+        lines.append('{:>32} {:>10} {:>10.4f} {:>10.4f}'.format(
+            name, function['calls'], function['seconds'],
+            function['own_seconds']))
+    lines.append('{:>32} {:>10}'.format('token', 'count'))
+    for name, count in sorted(report['tokens'].items()):
+        lines.append('{:>32} {:>10}'.format(name, count))
+    return '\n'.join(lines)
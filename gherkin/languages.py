@@ -19,6 +19,8 @@
 # Original:
 #   https://github.com/gabrielfalcao/lettuce/blob/master/lettuce/languages.py
 
+import re
+
 
 LANGUAGES = {
     'en': {
@@ -41,6 +43,7 @@ LANGUAGES = {
         'scenario_outline': 'Esquema do Cenário|Esquema do Cenario',
         'scenario_separator': '(Esquema do Cenário|Esquema do Cenario|Cenario|Cenário)',
         'background': '(?:Contexto|Considerações)',
+        'given': 'Dado|Dada|Dados|Dadas',
     },
     'pl': {
         'examples': 'Przykład',
@@ -51,6 +54,7 @@ LANGUAGES = {
         'scenario_outline': 'Zarys Scenariusza',
         'scenario_separator': '(Zarys Scenariusza|Scenariusz)',
         'background': '(?:Background)',
+        'given': 'Zakładając|Mając',
     },
     'ca': {
         'examples': 'Exemples',
@@ -61,6 +65,7 @@ LANGUAGES = {
         'scenario_outline': u"Esquema d'Escenari",
         'scenario_separator': u"(Esquema d'Escenari|Escenari)",
         'background': '(?:Background)',
+        'given': 'Donat|Donada|Atès|Atesa',
     },
     'es': {
         'examples': 'Ejemplos',
@@ -71,6 +76,7 @@ LANGUAGES = {
         'scenario_outline': 'Esquema de Escenario',
         'scenario_separator': '(Esquema de Escenario|Escenario)',
         'background': '(?:Contexto|Consideraciones)',
+        'given': 'Dado|Dada|Dados|Dadas',
     },
     'h': {
         'examples': 'Példák',
@@ -81,6 +87,7 @@ LANGUAGES = {
         'scenario_outline': 'Forgatókönyv vázlat',
         'scenario_separator': '(Forgatókönyv|Forgatókönyv vázlat)',
         'background': '(?:Háttér)',
+        'given': 'Amennyiben|Adott',
     },
     'fr': {
         'examples': 'Exemples|Scénarios',
@@ -91,6 +98,7 @@ LANGUAGES = {
         'scenario_outline': 'Plan de Scénario|Plan du Scénario',
         'scenario_separator': '(Plan de Scénario|Plan du Scénario|Scénario)',
         'background': '(?:Background|Contexte)',
+        'given': 'Soit|Sachant|Etant donnée?s?|Étant donnée?s?',
     },
     'de': {
         'examples': 'Beispiele|Szenarios',
@@ -101,6 +109,7 @@ LANGUAGES = {
         'scenario_outline': 'Szenario-Zusammenfassung|Zusammenfassung',
         'scenario_separator': '(Szenario-Zusammenfassung|Zusammenfassung)',
         'background': '(?:Background)',
+        'given': 'Angenommen|Gegeben seien|Gegeben sei',
     },
     'ja': {
         'examples': '例',
@@ -111,6 +120,7 @@ LANGUAGES = {
         'scenario_outline': 'シナリオアウトライン|シナリオテンプレート|テンプレ|シナリオテンプレ',
         'scenario_separator': '(シナリオ|シナリオアウトライン|シナリオテンプレート|テンプレ|シナリオテンプレ)',
         'background': '(?:Background)',
+        'given': '前提',
     },
     'tr': {
         'examples': 'Örnekler',
@@ -121,6 +131,7 @@ LANGUAGES = {
         'scenario_outline': 'Senaryo taslağı|Senaryo Taslağı',
         'scenario_separator': '(Senaryo taslağı|Senaryo Taslağı|Senaryo)',
         'background': '(?:Background)',
+        'given': 'Diyelim ki',
     },
     'zh-CN': {
         'examples': '例如|场景集',
@@ -131,6 +142,7 @@ LANGUAGES = {
         'scenario_outline': '场景模板',
         'scenario_separator': '(场景模板|场景)',
         'background': '(?:背景)',
+        'given': '假如|假设|假定',
     },
     'zh-TW': {
         'examples': '例如|場景集',
@@ -141,6 +153,7 @@ LANGUAGES = {
         'scenario_outline': '場景模板',
         'scenario_separator': '(場景模板|場景)',
         'background': '(?:背景)',
+        'given': '假如|假設|假定',
     },
     'r': {
         'examples': 'Примеры|Сценарии',
@@ -151,6 +164,7 @@ LANGUAGES = {
         'scenario_outline': 'Структура сценария',
         'scenario_separator': '(Структура сценария|Сценарий)',
         'background': '(?:Background)',
+        'given': 'Допустим|Дано|Пусть',
     },
     'uk': {
         'examples': 'Приклади|Сценарії',
@@ -161,6 +175,7 @@ LANGUAGES = {
         'scenario_outline': 'Структура сценарію',
         'scenario_separator': '(Структура сценарію|Сценарій)',
         'background': '(?:Background)',
+        'given': 'Припустимо, що|Припустимо|Нехай|Дано',
     },
     'it': {
         'examples': 'Esempi|Scenari|Scenarii',
@@ -171,6 +186,7 @@ LANGUAGES = {
         'scenario_outline': 'Schema di Scenario|Piano di Scenario',
         'scenario_separator': '(Schema di Scenario|Piano di Scenario|Scenario)',
         'background': '(?:Background)',
+        'given': 'Dato|Data|Dati|Date',
     },
     'no': {
         'examples': 'Eksempler',
@@ -181,6 +197,7 @@ LANGUAGES = {
         'scenario_outline': 'Situasjon Oversikt',
         'scenario_separator': '(Situasjon Oversikt|Situasjon)',
         'background': '(?:Bakgrunn)',
+        'given': 'Gitt',
     },
     'sv': {
         'examples': 'Exempel|Scenarion',
@@ -191,6 +208,7 @@ LANGUAGES = {
         'scenario_outline': 'Scenarioöversikt',
         'scenario_separator': '(Scenarioöversikt|Scenario)',
         'background': '(?:Context)',
+        'given': 'Givet',
     },
     'cz': {
         'examples': 'Příklady',
@@ -201,5 +219,12 @@ LANGUAGES = {
         'scenario_outline': 'Náčrt scénáře',
         'scenario_separator': '(Náčrt scénáře|Scénář)',
         'background': '(?:Background)',
+        'given': 'Pokud|Za předpokladu',
     },
 }
+
+
+def keyword(language, kind):
+    "Returns the first keyword of `kind' in `language'"
+    pattern = LANGUAGES[language][kind]
+    return re.sub(r'^\(\?:|^\(|\)$', '', pattern).split('|')[0]
@@ -0,0 +1,146 @@
+# -*- coding: utf-8; -*-
+"""Expands scenario outlines into the scenarios of their examples
+
+    for scenario in outlines.expand(outline):
+        run(scenario)
+
+Each step title, multi line string and table cell of an outline is
+compiled once into a template of its `<placeholder>' slots, then every
+row of the examples is rendered through them.  Scenarios are produced one
+at a time, and nodes without placeholders are shared between all of them
+instead of being copied for each row.
+"""
+
+import re
+
+from .parser import Ast
+
+
+PLACEHOLDER = re.compile(r'<([^<>\n]+)>')
+
+
+class Template(object):
+    """A string with `<placeholder>' slots for the columns of an examples table
+
+    Placeholders that aren't columns of the table are left as they are.
+    """
+
+    def __init__(self, text, columns):
+        self.text = text
+        self.render = self.constant
+        self.static = True
+        parts = PLACEHOLDER.split(text)
+        if len(parts) == 1:
+            return
+
+        # Compiled into a format string, so rendering happens in C
+        pattern = []
+        placeholders = False
+        for index, part in enumerate(parts):
+            if index % 2 and part in columns:
+                pattern.append('{{{}}}'.format(columns[part]))
+                placeholders = True
+            else:
+                if index % 2:
+                    part = '<{}>'.format(part)
+                pattern.append(part.replace('{', '{{').replace('}', '}}'))
+        if placeholders:
+            self.render = ''.join(pattern).format
+            self.static = False
+
+    def constant(self, *row):
+        return self.text
+
+
+class StepTemplate(object):
+    "The title, multi line string and table of a step, ready to be rendered"
+
+    def __init__(self, step, columns):
+        self.step = step
+        self.title = Template(step.title.text, columns)
+        self.text = None
+        if step.text is not None:
+            self.text = Template(step.text.text, columns)
+        self.table = None
+        if step.table is not None:
+            self.table = [[Template(cell, columns) for cell in row]
+                          for row in step.table.fields]
+        self.static = (
+            self.title.static and
+            (self.text is None or self.text.static) and
+            (self.table is None or
+             all(cell.static for row in self.table for cell in row)))
+
+    def render(self, row):
+        "Returns the step with the values of `row', or the step itself when it has no placeholders"
+        step = self.step
+        if self.static:
+            return step
+        title = step.title
+        if not self.title.static:
+            title = Ast.Text(line=title.line, text=self.title.render(*row))
+        table = step.table
+        if table is not None:
+            table = Ast.Table(line=table.line, fields=[
+                [cell.render(*row) for cell in cells] for cells in self.table])
+        text = step.text
+        if text is not None and not self.text.static:
+            text = Ast.Text(line=text.line, text=self.text.render(*row))
+        return Ast.Step(line=step.line, title=title, table=table, text=text)
+
+
+class OutlineTemplate(object):
+    "A scenario outline compiled against the columns of its examples"
+
+    def __init__(self, outline):
+        self.outline = outline
+        examples = outline.examples
+        fields = examples.table.fields if examples and examples.table else []
+        self.header = fields[0] if fields else []
+        self.rows = fields[1:]
+        self.line = examples.table.line if fields else None
+        self.tags = outline.tags + (examples.tags if examples else [])
+
+        columns = dict((name, index) for (index, name) in enumerate(self.header))
+        self.title = outline.title and Template(outline.title.text, columns)
+        self.steps = [StepTemplate(step, columns) for step in outline.steps]
+
+    def expand(self):
+        """Yields one `Ast.Scenario' per row of the examples
+
+        Raises ValueError on rows that don't have a cell for each column.
+        """
+        outline = self.outline
+        width = len(self.header)
+        for index, row in enumerate(self.rows, 1):
+            if not row:
+                continue  # Blank lines after the table
+            if len(row) != width:
+                # The lexers drop empty cells wherever they are, so
+                # there's no telling which column a value belongs to
+                raise ValueError(
+                    'Row in line {} of the examples has {} cells, '
+                    'but the header has {}'.format(
+                        self.line + index, len(row), width))
+            yield Ast.Scenario(
+                line=self.line + index,
+                title=self.title and Ast.Text(
+                    line=outline.title.line, text=self.title.render(*row)),
+                tags=list(self.tags),
+                description=outline.description,
+                steps=[step.render(row) for step in self.steps])
+
+
+def expand(outline):
+    "Yields the scenarios of `outline', one per row of its examples"
+    return OutlineTemplate(outline).expand()
+
+
+def expand_feature(feature):
+    "Yields the scenarios of `feature', expanding its outlines in place"
+    for scenario in feature.scenarios:
+        if isinstance(scenario, Ast.ScenarioOutline):
+            for expanded in expand(scenario):
+                yield expanded
+        else:
+            yield scenario
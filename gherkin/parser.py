@@ -1,6 +1,12 @@
 # -*- coding: utf-8; -*-
 
 from . import languages
+from array import array
+import codecs
+import collections
+import collections.abc
+import mmap
+import os
 import re
 
 
@@ -18,19 +24,121 @@ import re
 ) = range(10)
 
 
+def compile_language(values):
+    return dict(
+        (keyword, re.compile(regex))
+        for (keyword, regex) in values.items())
+
+
+class CompiledLanguages(collections.abc.Mapping):
+    """The keyword tables of all languages, each compiled on first use
+
+    Processes usually need one or two languages, so compiling all of them
+    upfront only makes importing the parser slower.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.compiled = {}
+
+    def __getitem__(self, language):
+        compiled = self.compiled.get(language)
+        if compiled is None:
+            compiled = self.compiled[language] = compile_language(
+                self.tables[language])
+        return compiled
+
+    def __contains__(self, language):
+        return language in self.tables
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def __len__(self):
+        return len(self.tables)
+
+
 def compiled_languages():
-    compiled = {}
-    for language, values in languages.LANGUAGES.items():
-        compiled[language] = dict(
-            (keyword, re.compile(regex))
-            for (keyword, regex) in values.items())
-    return compiled
+    return CompiledLanguages(languages.LANGUAGES)
 
 
 ## This should happen just once in the module life time
 LANGUAGES = compiled_languages()
 
 
+class Keywords(object):
+    """Tells what keywords a label is in one language
+
+    All the keywords are compiled into a single pattern anchored at the
+    end of the label, so `ScenarioX' isn't taken for a scenario, except
+    `given', which only has to start the label as the first word of a
+    step does.  Labels that are keywords are remembered, so the parser
+    only runs the pattern once for each of them.
+    """
+
+    KINDS = ('feature', 'background', 'scenario_outline', 'scenario',
+             'examples')
+    NONE = frozenset()
+
+    def __init__(self, table):
+        self.patterns = [
+            (kind, re.compile(r'(?:{})\s*\Z'.format(table[kind])))
+            for kind in self.KINDS if kind in table]
+        if 'given' in table:
+            # Ending in a word boundary, unless the keyword ends in a
+            # script that doesn't separate words, like Chinese
+            self.patterns.append(('given', re.compile(
+                r'(?:{})(?:\b|(?<=[^\x00-\u024f\u0370-\u04ff]))'.format(
+                    table['given']))))
+        self.pattern = re.compile('|'.join(
+            '(?P<{}>{})'.format(kind, pattern.pattern)
+            for (kind, pattern) in self.patterns))
+        self.labels = {}
+        self.steps = frozenset(['given'])
+        # (label, kinds) of the last label asked about, assigned at once
+        # since parsers in other threads share these keywords
+        self.last = (None, self.NONE)
+
+    def classify(self, label):
+        "Returns the set of keyword kinds `label' matches"
+        last = self.last
+        if label is last[0]:
+            return last[1]  # Asked again about the same token
+        kinds = self.labels.get(label)
+        if kinds is None:
+            if label.__class__ is Span:
+                # Matched right in the source, without slicing the label
+                match = self.pattern.match(label.chunk, label.start, label.end)
+            else:
+                match = self.pattern.match(label) if label is not None else None
+            if match is None:
+                kinds = self.NONE
+            elif match.lastgroup == 'given':
+                kinds = self.steps  # Keywords come first, so just a step
+            else:
+                # Keywords may be shared (`Požadavek' is both a feature
+                # and a scenario in Czech), so all of them are tried.
+                # There are few of them, so they're remembered
+                label = str(label)
+                kinds = self.labels[label] = frozenset(
+                    kind for (kind, pattern) in self.patterns
+                    if pattern.match(label))
+        self.last = (label, kinds)
+        return kinds
+
+
+KEYWORDS = {}
+
+
+def get_keywords(language):
+    "Returns the `Keywords' of `language', building them on first use"
+    keywords = KEYWORDS.get(language)
+    if keywords is None:
+        keywords = KEYWORDS[language] = Keywords(
+            languages.LANGUAGES[language])
+    return keywords
+
+
 class BaseParser(object):
 
     def __init__(self, stream):
@@ -40,10 +148,11 @@ class BaseParser(object):
         self.width = 0
 
     def next_(self):
-        if self.position >= len(self.stream):
+        try:
+            next_item = self.stream[self.position]
+        except IndexError:
             self.width = 0
             return None # EOF
-        next_item = self.stream[self.position]
         self.width = 1
         self.position += self.width
         return next_item
@@ -69,6 +178,8 @@ class BaseParser(object):
 class Lexer(BaseParser):
 
     def __init__(self, stream):
+        if not isinstance(stream, str):
+            stream = ''.join(stream)  # This lexer needs random access
         super(Lexer, self).__init__(stream)
         self.current_line = 1
         self.tokens = []
@@ -89,15 +200,22 @@ class Lexer(BaseParser):
             state = state()
         return self.tokens
 
+    def iter_tokens(self):
+        "Same as run() but yields the tokens as soon as they're found"
+        state = self.lex_text
+        while state:
+            state = state()
+            for token in self.tokens:
+                yield token
+            del self.tokens[:]
+
     def eat_whitespaces(self):
         while self.accept([' ', '\t']):
             self.ignore()
 
     def match_quotes(self, cursor):
-        stream_at_cursor = self.stream[self.position:]
         return cursor in ('"', "'") and (
-            stream_at_cursor.startswith('""') or
-            stream_at_cursor.startswith("''"))
+            self.stream.startswith(('""', "''"), self.position))
 
     def lex_field(self):
         self.eat_whitespaces()
@@ -145,7 +263,11 @@ class Lexer(BaseParser):
         internal_lines = 0
         while True:
             cursor = self.next_()
-            if self.match_quotes(cursor):
+            if cursor is None: # EOF, the quotes were never closed
+                self.emit_s(TOKEN_TEXT)
+                self.current_line += internal_lines
+                break
+            elif self.match_quotes(cursor):
                 # Consume all the text inside of the quotes
                 self.backup()
                 self.emit_s(TOKEN_TEXT)
@@ -210,14 +332,388 @@ class Lexer(BaseParser):
         return None
 
 
-class Parser(BaseParser):
+(
+    STATE_TEXT,
+    STATE_COMMENT,
+    STATE_META_VALUE,
+    STATE_FIELD,
+    STATE_TAG,
+    STATE_QUOTES,
+) = range(6)
+
+
+class ScannerLexer(object):
+    """Produces the same tokens as `Lexer', but scans whole lines at once
+
+    Instead of walking the input one character at a time, each state
+    jumps straight to the next character that matters using compiled
+    regular expressions. The `stream' can be either a string or any
+    iterable of lines (like a file object).
+    """
+
+    whitespaces = re.compile(r'[ \t]*').match
+    text_stop = re.compile(r'''[:#|@\n]|["'](?:""|'')''').search
+    comment_stop = re.compile(r'[:\n]').search
+    field_stop = re.compile(r'[|\n]').search
+    field_value = re.compile(r'\S(?:.*\S)?', re.S).search
+    tag_stop = re.compile(r'[ \n]').search
+    quotes_stop = re.compile(r'''["'](?:""|'')''').search
 
     def __init__(self, stream):
+        self.stream = stream
+        self.tokens = []
+
+    def chunks(self):
+        """Yields a (chunk, start, end) triple for each line
+
+        Lines of strings aren't copied, the chunk is the string itself
+        and the offsets delimit the line.
+        """
+        if isinstance(self.stream, str):
+            source = self.stream
+            find = source.find
+            size = len(source)
+            start = 0
+            while start < size:
+                end = find('\n', start) + 1 or size
+                yield source, start, end
+                start = end
+        else:
+            for line in self.stream:
+                yield line, 0, len(line)
+
+    def run(self):
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def run_buffer(self):
+        "Same as run() but collects the tokens in a `TokenBuffer'"
+        if not isinstance(self.stream, str):
+            raise TypeError('Only strings can be lexed into a TokenBuffer')
+        buffer = TokenBuffer(self.stream)
+        buffer.extend(self.iter_spans())
+        return buffer
+
+    def iter_tokens(self):
+        for number, token, chunk, start, end in self.iter_spans():
+            yield (number, token, chunk[start:end])
+
+    def iter_views(self):
+        """Same as iter_tokens() but the values of TEXT tokens are `Span's
+
+        Titles, steps and multi line strings are the bulk of a feature,
+        and they're left in the source until somebody reads them.
+        """
+        for number, token, chunk, start, end in self.iter_spans():
+            if token == TOKEN_TEXT:
+                yield (number, token, Span(chunk, start, end))
+            else:
+                yield (number, token, chunk[start:end])
+
+    def iter_spans(self):
+        """Yields (line, token, chunk, start, end) for each token found
+
+        The value of the token is chunk[start:end]. When the stream is
+        a string, the chunk is always the stream itself.
+        """
+        whitespaces = self.whitespaces
+        text_stop = self.text_stop
+        comment_stop = self.comment_stop
+        field_stop = self.field_stop
+        field_value = self.field_value
+        tag_stop = self.tag_stop
+        quotes_stop = self.quotes_stop
+
+        # Multi line strings of a string stream are spans of the stream
+        # itself, the ones spread across lines of other streams have
+        # their pieces glued together when they're closed
+        contiguous = isinstance(self.stream, str)
+        number = 1
+        quoted_line = None  # Line where the open multi line string started
+        quoted_start = None
+        pieces = None
+
+        for chunk, pos, end in self.chunks():
+            start = pos
+            state = STATE_TEXT if quoted_line is None else STATE_QUOTES
+
+            while True:
+                if state == STATE_TEXT:
+                    ws = whitespaces(chunk, pos, end).end()
+                    if ws != pos: pos = start = ws
+                    match = text_stop(chunk, pos, end)
+                    if match is None:
+                        if end > start:
+                            yield (number, TOKEN_TEXT, chunk, start, end)
+                        break
+                    i = match.start()
+                    cursor = chunk[i]
+                    if cursor == '\n':
+                        if i > start:
+                            yield (number, TOKEN_TEXT, chunk, start, i)
+                        yield (number, TOKEN_NEWLINE, chunk, i, end)
+                        number += 1
+                        break
+                    elif cursor == ':':
+                        if i > start:
+                            yield (number, TOKEN_LABEL, chunk, start, i)
+                        pos = start = i + 1
+                    elif cursor == '#':
+                        if i > start:
+                            yield (number, TOKEN_TEXT, chunk, start, i)
+                        start = i
+                        pos = i + 1
+                        state = STATE_COMMENT
+                    elif cursor == '|':
+                        pos = start = i + 1
+                        state = STATE_FIELD
+                    elif cursor == '@':
+                        pos = start = i + 1
+                        state = STATE_TAG
+                    else:
+                        pos = i + 3
+                        yield (number, TOKEN_QUOTES, chunk, start, pos)
+                        start = quoted_start = pos
+                        quoted_line = number
+                        if not contiguous:
+                            pieces = []
+                        state = STATE_QUOTES
+
+                elif state == STATE_COMMENT:
+                    ws = whitespaces(chunk, pos, end).end()
+                    if ws != pos: pos = start = ws
+                    match = comment_stop(chunk, pos, end)
+                    i = end if match is None else match.start()
+                    if i < end and chunk[i] == ':':
+                        yield (number, TOKEN_META_LABEL, chunk, start, i)
+                        pos = start = i + 1
+                        state = STATE_META_VALUE
+                    else:
+                        if i > start:
+                            yield (number, TOKEN_COMMENT, chunk, start, i)
+                        pos = start = i
+                        state = STATE_TEXT
+
+                elif state == STATE_META_VALUE:
+                    ws = whitespaces(chunk, pos, end).end()
+                    if ws != pos: pos = start = ws
+                    i = chunk.find('\n', pos, end)
+                    if i < 0: i = end
+                    if i > start:
+                        yield (number, TOKEN_META_VALUE, chunk, start, i)
+                    pos = start = i
+                    state = STATE_TEXT
+
+                elif state == STATE_FIELD:
+                    ws = whitespaces(chunk, pos, end).end()
+                    if ws != pos: pos = start = ws
+                    match = field_stop(chunk, pos, end)
+                    if match is None:
+                        pos = end
+                    else:
+                        i = match.start()
+                        if chunk[i] == '|':
+                            if i > start:
+                                value = field_value(chunk, start, i)
+                                if value is None:
+                                    yield (number, TOKEN_TABLE_COLUMN, chunk, i, i)
+                                else:
+                                    yield (number, TOKEN_TABLE_COLUMN, chunk,
+                                           value.start(), value.end())
+                            start = i
+                        pos = i
+                    state = STATE_TEXT
+
+                elif state == STATE_TAG:
+                    match = tag_stop(chunk, pos, end)
+                    i = end if match is None else match.start()
+                    if i > start:
+                        yield (number, TOKEN_TAG, chunk, start, i)
+                    pos = start = i
+                    state = STATE_TEXT
+
+                else: # STATE_QUOTES
+                    match = quotes_stop(chunk, pos, end)
+                    if match is None:
+                        if not contiguous:
+                            pieces.append(chunk[start:end])
+                        if chunk[end - 1] == '\n':
+                            number += 1
+                        break
+                    i = match.start()
+                    if contiguous:
+                        if i > quoted_start:
+                            yield (quoted_line, TOKEN_TEXT, chunk, quoted_start, i)
+                    else:
+                        pieces.append(chunk[start:i])
+                        text = ''.join(pieces)
+                        if text:
+                            yield (quoted_line, TOKEN_TEXT, text, 0, len(text))
+                        pieces = None
+                    pos = start = i + 3
+                    yield (number, TOKEN_QUOTES, chunk, i, pos)
+                    quoted_line = None
+                    state = STATE_TEXT
+
+        if contiguous:
+            size = len(self.stream)
+            if quoted_line is not None and size > quoted_start:
+                yield (quoted_line, TOKEN_TEXT, self.stream, quoted_start, size)
+            yield (number, TOKEN_EOF, self.stream, size, size)
+        else:
+            if quoted_line is not None:
+                text = ''.join(pieces)
+                if text:
+                    yield (quoted_line, TOKEN_TEXT, text, 0, len(text))
+            yield (number, TOKEN_EOF, '', 0, 0)
+
+
+class Span(object):
+    """Where the value of a token is found, instead of the value itself
+
+    The value is chunk[start:end], which str() slices out.
+    """
+
+    __slots__ = ('chunk', 'start', 'end')
+
+    def __init__(self, chunk, start, end):
+        self.chunk = chunk
+        self.start = start
+        self.end = end
+
+    def __str__(self):
+        return self.chunk[self.start:self.end]
+
+    def __repr__(self):
+        return 'Span({}, {}, {!r})'.format(self.start, self.end, str(self))
+
+
+class TokenBuffer(object):
+    """Tokens kept as parallel arrays instead of a list of tuples
+
+    Only the line, the type and the offsets of each token into `source'
+    are stored. Values are sliced out of the source when a token is
+    read, so the buffer can be handed to the `Parser' like a list.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.lines = array('i')
+        self.types = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return (self.lines[index], self.types[index],
+                self.source[self.starts[index]:self.ends[index]])
+
+    def value(self, index):
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def extend(self, spans):
+        "Appends the (line, token, chunk, start, end) spans of a lexer"
+        lines = self.lines.append
+        types = self.types.append
+        starts = self.starts.append
+        ends = self.ends.append
+        for line, token, _, start, end in spans:
+            lines(line)
+            types(token)
+            starts(start)
+            ends(end)
+
+
+class TokenWindow(object):
+    """Random access to the latest tokens yielded by an iterator
+
+    At least the last `size' tokens are kept, which is all the `Parser'
+    needs to backup. The latest run of new lines is never split though,
+    and neither is it cut from the token before it, since the parser
+    might backup over the whole run at once, even after peeking past it.
+    """
+
+    def __init__(self, tokens, size=16):
+        self.tokens = iter(tokens)
+        self.size = size
+        self.window = collections.deque()
+        self.offset = 0     # Position of the first token in the window
+        self.keep = None    # Position of the token before the latest run of new lines
+        self.newline = False  # Whether the newest token is a new line
+
+    def __getitem__(self, index):
+        window = self.window
+        while index >= self.offset + len(window):
+            try:
+                token = next(self.tokens)
+            except StopIteration:
+                raise IndexError('No more tokens')
+            newline = token is not None and token[1] == TOKEN_NEWLINE
+            if newline and not self.newline:
+                self.keep = self.offset + len(window) - 1
+            self.newline = newline
+            window.append(token)
+            while len(window) > self.size and (
+                    self.keep is None or self.offset < self.keep):
+                window.popleft()
+                self.offset += 1
+        if index < self.offset:
+            raise LookupError(
+                'Token {} is out of the window of tokens'.format(index))
+        return window[index - self.offset]
+
+
+class Diagnostic(object):
+    "A problem found in a feature, at a line and column that start at 1"
+
+    def __init__(self, line, column, message):
+        self.line = line
+        self.column = column  # None when the source wasn't available
+        self.message = message
+
+    def __eq__(self, other):
+        return (isinstance(other, Diagnostic) and
+                (self.line, self.column, self.message) ==
+                (other.line, other.column, other.message))
+
+    def __repr__(self):
+        return 'Diagnostic(line={!r}, column={!r}, message={!r})'.format(
+            self.line, self.column, self.message)
+
+    def __str__(self):
+        if self.column is None:
+            return '{}: {}'.format(self.line, self.message)
+        return '{}:{}: {}'.format(self.line, self.column, self.message)
+
+
+class Parser(BaseParser):
+    """Builds an `Ast.Feature' out of a stream of tokens
+
+    With `views' set, the values of TEXT tokens are expected to be
+    `Span's, like `ScannerLexer.iter_views()' yields, and titles, steps
+    and multi line strings become `Ast.TextView's of the source.
+
+    Errors raise SyntaxError, unless a list is given as `diagnostics'.
+    Then each error is appended to it as a `Diagnostic' and the parser
+    skips to the next scenario, feature or tag line, so everything
+    wrong with a file is found in a single pass over a partial tree.
+    Columns are only known when the `lines' of the source are given.
+    """
+
+    def __init__(self, stream, encoding='utf-8', views=False,
+                 diagnostics=None, lines=None):
+        if not hasattr(stream, '__getitem__'):
+            stream = TokenWindow(stream)
         super(Parser, self).__init__(stream)
         self.output = []
-        self.encoding = 'utf-8'
+        self.encoding = encoding
+        self.text = self.view if views else Ast.Text
+        self.diagnostics = diagnostics
+        self.lines = lines
         self.language = 'en'
-        self.languages = LANGUAGES
+        self.keywords = None  # Only built once a keyword is looked for
 
     def accept(self, valid):
         _, token, value = self.next_()
@@ -227,12 +723,62 @@ class Parser(BaseParser):
         return False
 
     def next_(self):
-        "Same as BaseParser.next_() but returns (None, None) instead of None on EOF"
-        output = super(Parser, self).next_()
+        "Same as BaseParser.next_() but returns (None, None, None) instead of None on EOF"
+        try:
+            output = self.stream[self.position]
+        except IndexError:
+            self.width = 0
+            return (None, None, None)
+        self.width = 1
+        self.position += 1
         return (None, None, None) if output is None else output
 
+    @staticmethod
+    def view(line, value):
+        "Builds the node of a text that might be a `Span' of the source"
+        if value.__class__ is Span:
+            return Ast.TextView(line, value.chunk, value.start, value.end)
+        return Ast.Text(line, value)  # Labels, like `Given:', are strings
+
     def match_label(self, type_, label):
-        return self.languages[self.language][type_].match(label)
+        keywords = self.keywords or self.set_language(self.language)
+        return type_ in keywords.classify(label)
+
+    def error(self, line, value, message):
+        "Raises SyntaxError, or takes note of it when recovering from errors"
+        if self.diagnostics is None:
+            raise SyntaxError(message)
+        column = None
+        if self.lines is not None and line is not None and 0 < line <= len(self.lines):
+            # Where the offending token is, or the line starts
+            text = self.lines[line - 1]
+            value = str(value).strip() if value is not None else ''
+            index = text.find(value) if value else -1
+            if index < 0:
+                index = len(text) - len(text.lstrip())
+            column = index + 1
+        self.diagnostics.append(Diagnostic(line, column, message))
+
+    def synchronize(self):
+        "Skips tokens up to the next scenario, feature or tag"
+        while True:
+            _, token, value = self.next_()
+            if token in (None, TOKEN_EOF, TOKEN_TAG) or (
+                    token == TOKEN_LABEL and (
+                        self.match_label('scenario', value) or
+                        self.match_label('scenario_outline', value) or
+                        self.match_label('feature', value))):
+                self.backup()
+                return
+            self.ignore()
+
+    def set_language(self, language):
+        "Matches keywords in `language' from now on"
+        if language not in languages.LANGUAGES:
+            raise SyntaxError('Unknown language `{}\''.format(language))
+        self.language = language
+        self.keywords = get_keywords(language)
+        return self.keywords
 
     def eat_newlines(self):
         count = 0
@@ -246,7 +792,7 @@ class Parser(BaseParser):
         "Parses the stream until token != TOKEN_TEXT than returns Text()"
         line, token, value = self.next_()
         if token == TOKEN_TEXT:
-            return Ast.Text(line=line, text=value)
+            return self.text(line, value)
         else:
             self.backup()
             return None
@@ -258,18 +804,19 @@ class Parser(BaseParser):
             line, token, value = self.next_()
             if not len(description):
                 start_line = line
-            if self.match_label('given', value):
+            if token == TOKEN_NEWLINE:
+                self.ignore()
+            elif self.match_label('given', value):
                 self.backup()
                 break
             elif token == TOKEN_TEXT:
                 description.append(value)
-            elif token == TOKEN_NEWLINE:
-                self.ignore()
             else:
                 self.backup()
                 break
         if description:
-            return Ast.Text(line=start_line, text=' '.join(description))
+            # Views are sliced here, lines joined together aren't in the source
+            return Ast.Text(line=start_line, text=' '.join(map(str, description)))
         else:
             return None
 
@@ -284,13 +831,18 @@ class Parser(BaseParser):
             self.parse_steps())
 
     def parse_step_text(self):
-        self.next_(); self.ignore()  # Skip enter QUOTES
-        line, token, step_text = self.next_()
-        assert token == TOKEN_TEXT
-        _, token, _ = self.next_()   # Skip exit QUOTES
-        assert token == TOKEN_QUOTES
+        line, _, quotes = self.next_(); self.ignore()  # Skip enter QUOTES
+        text_line, token, step_text = self.next_()
+        if token == TOKEN_TEXT:
+            line = text_line
+            _, token, _ = self.next_()   # Skip exit QUOTES
+        else:
+            step_text = ''  # Nothing between the quotes
+        if token != TOKEN_QUOTES:
+            self.error(line, quotes, 'Multi line string never closed')
+            self.backup()
         self.ignore()
-        return Ast.Text(line=line, text=step_text)
+        return self.text(line, step_text)
 
     def parse_steps(self):
         steps = []
@@ -305,18 +857,18 @@ class Parser(BaseParser):
                   self.match_label('examples', value)):
                 steps.append(Ast.Step(
                     line=line,
-                    title=Ast.Text(line=line, text=value),
+                    title=self.text(line, value),
                     table=self.parse_table()))
             elif (token in (TOKEN_LABEL, TOKEN_TEXT) and
                   next_token == TOKEN_QUOTES):
                 steps.append(Ast.Step(
                     line=line,
-                    title=Ast.Text(line=line, text=value),
+                    title=self.text(line, value),
                     text=self.parse_step_text()))
             elif token == TOKEN_TEXT:
                 steps.append(Ast.Step(
                     line=line,
-                    title=Ast.Text(line=line, text=value)))
+                    title=self.text(line, value)))
             else:
                 self.backup(backup + 1)
                 break
@@ -344,7 +896,9 @@ class Parser(BaseParser):
         self.eat_newlines()
         tags = self.parse_tags()
         line, token, value = self.next_()
-        assert token == TOKEN_LABEL and self.match_label('examples', value)
+        if token != TOKEN_LABEL or not self.match_label('examples', value):
+            self.backup()
+            return None
         self.eat_newlines()
         return Ast.Examples(line=line, tags=tags, table=self.parse_table())
 
@@ -364,6 +918,8 @@ class Parser(BaseParser):
                 scenario.description = self.parse_description()
                 scenario.steps = self.parse_steps()
                 scenario.examples = self.parse_examples()
+                if scenario.examples is None:
+                    self.error(line, value, 'Scenario Outline without Examples')
             elif self.match_label('scenario', value):
                 scenario = Ast.Scenario(line=line)
                 scenario.tags = tags
@@ -371,9 +927,11 @@ class Parser(BaseParser):
                 scenario.description = self.parse_description()
                 scenario.steps = self.parse_steps()
             else:
-                raise SyntaxError(
-                    ('`{}\' should not be declared here, '
-                     'Scenario or Scenario Outline expected').format(value))
+                self.error(line, value, (
+                    '`{}\' should not be declared here, '
+                    'Scenario or Scenario Outline expected').format(value))
+                self.synchronize()
+                continue
             scenarios.append(scenario)
         return scenarios
 
@@ -390,15 +948,40 @@ class Parser(BaseParser):
                 break
         return tags
 
+    def parse_header(self):
+        "Skips the comments before the feature, switching to the language they ask for"
+        while True:
+            line, token, value = self.next_()
+            if token in (TOKEN_NEWLINE, TOKEN_COMMENT):
+                self.ignore()
+            elif token == TOKEN_META_LABEL:
+                self.backup()
+                metadata = self.parse_metadata()
+                if metadata is not None and metadata.key == 'language':
+                    if metadata.value in languages.LANGUAGES:
+                        self.set_language(metadata.value)
+                    else:
+                        self.error(metadata.line, metadata.value,
+                                   'Unknown language `{}\''.format(metadata.value))
+            else:
+                self.backup()
+                break
+
     def parse_feature(self):
         feature = Ast.Feature()
+        self.parse_header()
         feature.tags = self.parse_tags()
 
         line, _, label = self.next_()
         if not self.match_label('feature', label):
-            raise SyntaxError(
+            self.error(line, label, (
                 'Feature expected in the beginning of the file, '
-                'found `{}\' though.'.format(label))
+                'found `{}\' though.').format(label))
+            # The scenarios that follow are still worth parsing
+            self.backup()
+            self.synchronize()
+            feature.scenarios = self.parse_scenarios()
+            return feature
 
         feature.line = line
         feature.title = self.parse_title()
@@ -416,40 +999,211 @@ class Parser(BaseParser):
         if token in (None, TOKEN_EOF):
             return
         elif token != TOKEN_META_VALUE:
+            self.error(line, key,
+                       'No value found for the meta-field `{}\''.format(key))
+            self.backup()
+            return None
+        # Like `# language: pt-br  ', or lines ending in \r\n
+        return Ast.Metadata(line, key.strip(), value.strip())
+
+
+class Skimmer(object):
+    """Finds the headers of a feature and its scenarios, skipping everything else
+
+    Instead of going through tokens, a single pattern looks for the lines
+    that matter straight in the text: tags, labels and meta fields.  The
+    bodies of multi line strings are jumped over and tables, comments and
+    steps are never looked at closely, so no `Ast.Step' or `Ast.Table' is
+    built.  Features laid out as usual, with tags and labels at the start
+    of their lines, get the same lines, titles and tags `parse()' finds.
+    """
+
+    lines = re.compile(r'''
+        (?P<quotes>["'](?:""|''))
+        | ^[ \t]*(?:
+            (?P<tags>@[^\n]*)
+          | \#[ \t]*(?P<meta>[^:\n]*):[ \t]*(?P<value>[^\n]*)
+          | [|\#][^\n]*
+          | (?P<label>[^:\#|@\n"'][^:\#|@\n]*):(?P<title>[^:\#|@\n]*)
+        )''', re.M | re.X).search
+    quotes_stop = re.compile(r'''["'](?:""|'')''').search
+    tag = re.compile(r'@([^ \n]+)').findall
+
+    def __init__(self, stream):
+        if not isinstance(stream, str):
+            stream = ''.join(stream)
+        self.stream = stream
+        self.keywords = get_keywords('en')
+
+    def set_language(self, language):
+        if language not in languages.LANGUAGES:
+            raise SyntaxError('Unknown language `{}\''.format(language))
+        self.keywords = get_keywords(language)
+
+    def skim(self):
+        "Returns an `Ast.Header' for the feature, holding the ones of its scenarios"
+        text = self.stream
+        feature = outline = None
+        tags = []
+        line = 1
+        counted = position = 0
+        while True:
+            match = self.lines(text, position)
+            if match is None:
+                break
+            start = match.start()
+            line += text.count('\n', counted, start)
+            counted = start
+            position = match.end()
+            kind = match.lastgroup
+
+            if kind == 'quotes':
+                closing = self.quotes_stop(text, position)
+                position = closing.end() if closing else len(text)
+            elif kind == 'tags':
+                tags.extend(self.tag(match.group('tags').split('#', 1)[0]))
+            elif kind == 'value':
+                if (feature is None and
+                        match.group('meta').strip() == 'language'):
+                    self.set_language(match.group('value').strip())
+            elif kind == 'title':
+                label = match.group('label')
+                title = match.group('title')
+                quotes = self.quotes_stop(title)
+                if quotes:  # The rest of the line is a multi line string
+                    title = title[:quotes.start()]
+                    position = match.start('title') + quotes.start()
+                kinds = self.keywords.classify(label)
+                if not kinds or 'given' in kinds:
+                    position = match.end('label')  # A step, keep looking for quotes
+                    continue
+                # Trailing whitespace is kept, like the lexers do
+                header = Ast.Header(
+                    line, None, title.lstrip(' \t') or None, tags)
+                tags = []
+                if feature is None:
+                    if 'feature' not in kinds:
+                        break
+                    header.kind = 'feature'
+                    feature = header
+                elif 'scenario_outline' in kinds:
+                    header.kind = 'scenario_outline'
+                    feature.children.append(header)
+                    outline = header
+                elif 'scenario' in kinds:
+                    header.kind = 'scenario'
+                    feature.children.append(header)
+                    outline = None
+                elif 'examples' in kinds and outline is not None:
+                    header.kind = 'examples'
+                    outline.children.append(header)
+
+        if feature is None:
             raise SyntaxError(
-                'No value found for the meta-field `{}\''.format(key))
-        return Ast.Metadata(line, key, value)
+                'Feature expected in the beginning of the file, '
+                'found `{}\' though.'.format(
+                    match and match.group('label').strip()))
+        return feature
+
+
+## Nodes keep their fields in __slots__, which saves a lot of memory on
+## big trees. Setting GHERKIN_LEGACY_AST in the environment brings back
+## the old nodes, that store everything in a regular __dict__.
+LEGACY_AST = bool(os.environ.get('GHERKIN_LEGACY_AST'))
+
+
+def slots(*fields):
+    return () if LEGACY_AST else fields
 
 
 class Ast(object):
 
     class Node(object):
-        def __eq__(self, other):
-            return getattr(other, '__dict__', None) == self.__dict__
+        _fields = ()
 
-        def __repr__(self):
-            fields = ['{}={}'.format(x[0], repr(x[1]))
-                      for x in self.__dict__.items()]
-            return '{}({})'.format(self.__class__.__name__, ', '.join(fields))
+        if LEGACY_AST:
+            def __eq__(self, other):
+                return getattr(other, '__dict__', None) == self.__dict__
+
+            def __repr__(self):
+                fields = ['{}={}'.format(x[0], repr(x[1]))
+                          for x in self.__dict__.items()]
+                return '{}({})'.format(self.__class__.__name__, ', '.join(fields))
+        else:
+            __slots__ = ()
+
+            def __eq__(self, other):
+                if getattr(other, '_fields', None) != self._fields:
+                    return False
+                for field in self._fields:
+                    if getattr(self, field) != getattr(other, field):
+                        return False
+                return True
+
+            def __repr__(self):
+                fields = ['{}={}'.format(x, repr(getattr(self, x)))
+                          for x in self._fields]
+                return '{}({})'.format(self.__class__.__name__, ', '.join(fields))
 
     class Metadata(Node):
+        _fields = ('line', 'key', 'value')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, key, value):
             self.line = line
             self.key = key
             self.value = value
 
     class Text(Node):
+        _fields = ('line', 'text')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, text):
             self.line = line
             self.text = text
 
+    class TextView(Text):
+        """A `Text' that only knows where its text is in the source
+
+        The text is sliced out of `chunk' each time it's read, so keep it
+        around when it's needed more than once.  Views are equal to the
+        `Text' of the same text, and are pickled as one.
+        """
+        __slots__ = slots('chunk', 'start', 'end')
+
+        def __init__(self, line, chunk, start, end):
+            self.line = line
+            self.chunk = chunk
+            self.start = start
+            self.end = end
+
+        @property
+        def text(self):
+            return self.chunk[self.start:self.end]
+
+        def __eq__(self, other):
+            return (isinstance(other, Ast.Text) and
+                    self.line == other.line and self.text == other.text)
+
+        def __repr__(self):
+            return 'TextView(line={!r}, text={!r})'.format(self.line, self.text)
+
+        def __reduce__(self):
+            return (Ast.Text, (self.line, self.text))
+
     class Background(Node):
+        _fields = ('line', 'title', 'steps')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, title=None, steps=None):
             self.line = line
             self.title = title
             self.steps = steps or []
 
     class Feature(Node):
+        _fields = ('line', 'title', 'tags', 'description', 'background', 'scenarios')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line=None, title=None, tags=None, description=None, background=None, scenarios=None):
             self.line = line
             self.title = title
@@ -459,6 +1213,9 @@ class Ast(object):
             self.scenarios = scenarios or []
 
     class Scenario(Node):
+        _fields = ('line', 'title', 'tags', 'description', 'steps')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, title=None, tags=None, description=None, steps=None):
             self.line = line
             self.title = title
@@ -467,6 +1224,9 @@ class Ast(object):
             self.steps = steps or []
 
     class ScenarioOutline(Node):
+        _fields = ('line', 'title', 'tags', 'description', 'steps', 'examples')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, title=None, tags=None, description=None, steps=None, examples=None):
             self.line = line
             self.title = title
@@ -476,6 +1236,9 @@ class Ast(object):
             self.examples = examples
 
     class Step(Node):
+        _fields = ('line', 'title', 'table', 'text')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, title, table=None, text=None):
             self.line = line
             self.title = title
@@ -483,12 +1246,195 @@ class Ast(object):
             self.text = text
 
     class Table(Node):
+        _fields = ('line', 'fields')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, fields):
             self.line = line
             self.fields = fields
 
     class Examples(Node):
+        _fields = ('line', 'tags', 'table')
+        __slots__ = slots(*_fields)
+
         def __init__(self, line, tags=None, table=None):
             self.line = line
             self.tags = tags or []
             self.table = table
+
+    class Header(Node):
+        "The line, title and tags of a feature, scenario or examples, found by `skim()'"
+        _fields = ('line', 'kind', 'title', 'tags', 'children')
+        __slots__ = slots(*_fields)
+
+        def __init__(self, line, kind, title=None, tags=None, children=None):
+            self.line = line
+            self.kind = kind
+            self.title = title
+            self.tags = tags or []
+            self.children = children or []
+
+LEXERS = {
+    'char': Lexer,
+    'scanner': ScannerLexer,
+}
+
+DEFAULT_LEXER = 'scanner'
+
+
+def get_lexer(stream, lexer=DEFAULT_LEXER):
+    "Returns an instance of the chosen lexer engine loaded with `stream'"
+    try:
+        lexer_class = LEXERS[lexer]
+    except KeyError:
+        raise ValueError('Unknown lexer engine `{}\''.format(lexer))
+    return lexer_class(stream)
+
+
+def tokenize(stream, lexer=DEFAULT_LEXER, buffer=False):
+    """Returns the list of tokens found in `stream' by the chosen lexer engine
+
+    With `buffer' set, tokens are returned in a `TokenBuffer' instead of
+    a list, which only the scanner engine supports.
+    """
+    instance = get_lexer(stream, lexer)
+    if buffer:
+        if not hasattr(instance, 'run_buffer'):
+            raise ValueError(
+                'The lexer engine `{}\' has no buffer support'.format(lexer))
+        return instance.run_buffer()
+    return instance.run()
+
+
+def get_tokens(instance, views=False, interner=None):
+    """Returns the tokens of a lexer `instance'
+
+    TEXT values are `Span's in `views', and values are deduplicated by
+    the `gherkin.interning.Interner' given as `interner'.
+    """
+    if not views:
+        tokens = instance.iter_tokens()
+    elif hasattr(instance, 'iter_views'):
+        tokens = instance.iter_views()
+    else:
+        raise ValueError('The `{}\' lexer has no views support'.format(
+            instance.__class__.__name__))
+    if interner is not None:
+        tokens = interner.tokens(tokens)
+    return tokens
+
+
+def run_parser(instance, encoding='utf-8', profile=None, views=False,
+               interner=None, diagnostics=None, lines=None):
+    "Parses the tokens of a lexer `instance' with the options of the parse functions"
+    if profile is not None:
+        return profile.parse(
+            instance, encoding, views, interner, diagnostics, lines)
+    tokens = get_tokens(instance, views, interner)
+    return Parser(
+        tokens, encoding, views, diagnostics, lines).parse_feature()
+
+
+def keep_lines(lines, kept):
+    "Yields each one of `lines', appending them to `kept' on the way"
+    for line in lines:
+        kept.append(line)
+        yield line
+
+
+def parse(stream, lexer=DEFAULT_LEXER, profile=None, views=False,
+          interner=None, diagnostics=None):
+    """Parses `stream' and returns an `Ast.Feature'
+
+    Tokens are streamed from the lexer to the parser, so the full list
+    of tokens never exists in memory.  Pass a `gherkin.instrument.Profile'
+    as `profile' to find out where the time goes.
+
+    With `views' set, texts are `Ast.TextView's that only slice their
+    text out of `stream' when it's read, which only the scanner engine
+    supports.  Repeated strings are shared through `interner', a
+    `gherkin.interning.Interner', when one is given.
+
+    When a list is given as `diagnostics', errors don't raise
+    SyntaxError: they're all appended to it as `Diagnostic's, and the
+    feature returned has whatever could be parsed.
+    """
+    lines = None
+    if diagnostics is not None:
+        if isinstance(stream, str):
+            lines = stream.split('\n')
+        else:
+            lines = []
+            stream = keep_lines(stream, lines)
+    instance = get_lexer(stream, lexer)
+    return run_parser(
+        instance, 'utf-8', profile, views, interner, diagnostics, lines)
+
+
+def skim(stream):
+    """Returns the `Ast.Header' of the feature in `stream'
+
+    Only the lines, titles and tags of the feature, its scenarios and
+    their examples are found, which is several times faster than
+    `parse()' for tools like test discovery.
+    """
+    return Skimmer(stream).skim()
+
+
+def decode_lines(chunks, encoding='utf-8'):
+    """Yields the lines of `chunks' as text, decoding the ones that are bytes
+
+    Bytes are decoded incrementally and only split into lines after
+    that, since encodings like UTF-16 don't split on the byte of `\\n'.
+    """
+    decode = codecs.getincrementaldecoder(encoding)().decode
+    pending = ''
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decode(chunk)
+        if pending:
+            chunk = pending + chunk
+        start = 0
+        while True:
+            end = chunk.find('\n', start) + 1
+            if not end:
+                break
+            yield chunk[start:end]
+            start = end
+        pending = chunk[start:]
+    pending += decode(b'', True)
+    if pending:
+        yield pending
+
+
+def parse_stream(fileobj, lexer=DEFAULT_LEXER, encoding='utf-8', profile=None,
+                 views=False, interner=None, diagnostics=None):
+    """Parses a file object (or any iterable of lines) into an `Ast.Feature'
+
+    Lines are read and decoded one at a time, so the whole content of
+    the file is never loaded at once.  Views of `views' are over the
+    decoded lines.
+    """
+    stream = decode_lines(fileobj, encoding)
+    lines = None
+    if diagnostics is not None:
+        lines = []
+        stream = keep_lines(stream, lines)
+    instance = get_lexer(stream, lexer)
+    return run_parser(
+        instance, encoding, profile, views, interner, diagnostics, lines)
+
+
+def parse_file(path, lexer=DEFAULT_LEXER, encoding='utf-8', profile=None,
+               views=False, interner=None, diagnostics=None):
+    "Parses the file found at `path' into an `Ast.Feature'"
+    with open(path, 'rb') as fileobj:
+        try:
+            buffer = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error):
+            # Empty files and some special ones can't be mapped
+            return parse_stream(fileobj, lexer, encoding, profile, views,
+                                interner, diagnostics)
+        with buffer:
+            return parse_stream(iter(buffer.readline, b''), lexer, encoding,
+                                profile, views, interner, diagnostics)
@@ -0,0 +1,429 @@
+# -*- coding: utf-8; -*-
+"""Compact binary encoding of `Ast.Feature' trees
+
+    >>> data = dumps(feature)
+    >>> loads(data) == feature
+    True
+
+An encoded feature is made of a header and three sections:
+
+  * strings: every distinct title, tag, table cell and text, stored
+    once in a single utf-8 blob, separated by NUL characters (or with
+    their lengths when some string has NULs of its own);
+
+  * lines: the line of each node, as the difference to the previous one
+    of its type plus one, written as varints.  Lines mostly grow by a
+    little, so nearly all of them fit in a single byte.  A zero is
+    followed by how much the line goes back instead, or by another
+    zero when the node has no line;
+
+  * values: ids in the string table, references to other nodes and
+    counts, as an array of fixed width integers, the narrowest one that
+    fits the largest value.
+
+Nodes are grouped by type, so the texts, tables and steps are each
+written as one run that's decoded in bulk, while the feature and its
+scenarios refer to them by position (plus one, zero being none).
+"""
+
+import array
+import itertools
+import operator
+import re
+import struct
+import sys
+
+from .parser import Ast
+
+
+MAGIC = b'GHKB'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sBBcII')  # magic, version, flags, typecode, sizes of strings and lines
+
+SEPARATED = 0x01  # Strings are separated by NULs instead of having lengths
+
+TYPECODES = (('B', 1 << 8), ('H', 1 << 16), ('I', 1 << 32))
+
+MULTIBYTE = re.compile(br'[\x80-\xff]+[\x00-\x7f]')
+
+# Kinds of scenarios
+SCENARIO, SCENARIO_OUTLINE = 0, 1
+
+
+def encode_varints(values):
+    if not values or max(values) < 0x80:
+        return bytes(values)
+    data = bytearray()
+    for value in values:
+        while value >= 0x80:
+            data.append(value & 0x7f | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def decode_varints(data):
+    "Returns the values of the varints in `data'; only multibyte ones cost"
+    if max(data, default=0) < 0x80:
+        return list(data)
+    values = []
+    start = 0
+    for match in MULTIBYTE.finditer(data):
+        values.extend(data[start:match.start()])
+        value = shift = 0
+        for byte in match.group():
+            value |= (byte & 0x7f) << shift
+            shift += 7
+        values.append(value)
+        start = match.end()
+    values.extend(data[start:])
+    return values
+
+
+def encode_lines(lines):
+    "Returns the differences between `lines', ready to be written as varints"
+    values = []
+    last = 0
+    for line in lines:
+        if line is None:
+            values.extend((0, 0))
+            continue
+        delta = line - last
+        last = line
+        if delta >= 0:
+            values.append(delta + 1)
+        else:
+            values.extend((0, -delta))
+    return values
+
+
+def decode_lines(values):
+    if 0 not in values:
+        # Lines only grow, so they're the sums of the differences
+        return list(map(operator.sub, itertools.accumulate(values),
+                        itertools.count(1)))
+    lines = []
+    last = 0
+    values = iter(values)
+    for value in values:
+        if value:
+            last += value - 1
+            lines.append(last)
+            continue
+        value = next(values)
+        if value:
+            last -= value
+            lines.append(last)
+        else:
+            lines.append(None)
+    return lines
+
+
+class Column(object):
+    "The values and lines of the nodes of one type, in the order they're found"
+
+    def __init__(self):
+        self.values = []
+        self.lines = []
+        self.count = 0
+        self.cells = []  # Only used by tables, which hold all cells at the end
+
+
+class Encoder(object):
+    "Splits a feature into the string table and a column per type of node"
+
+    def __init__(self):
+        self.strings = {}  # string -> its id in the table
+        self.texts = Column()
+        self.tables = Column()
+        self.steps = Column()
+        self.titles, self.step_tables, self.step_texts = [], [], []
+        self.tree = Column()  # The feature, its background and scenarios
+
+    def string(self, text):
+        strings = self.strings
+        id_ = strings.get(text)
+        if id_ is None:
+            id_ = strings[text] = len(strings) + 1
+        return id_
+
+    def text(self, node):
+        "Returns the reference to an optional `Ast.Text'"
+        if node is None:
+            return 0
+        texts = self.texts
+        texts.values.append(self.string(node.text))
+        texts.lines.append(node.line)
+        texts.count += 1
+        return texts.count
+
+    def table(self, table):
+        if table is None:
+            return 0
+        tables = self.tables
+        fields = table.fields
+        tables.lines.append(table.line)
+        tables.values.append(len(fields))
+        # Tables followed by blank lines end with an empty row
+        empty = 0
+        while empty < len(fields) and not fields[-1 - empty]:
+            empty += 1
+        widths = set(map(len, fields[:len(fields) - empty]))
+        if len(widths) == 1:
+            tables.values.append(widths.pop())
+            tables.values.append(empty)
+        else:
+            # Rows of different widths, so each one gives its own
+            tables.values.append(0)
+            tables.values.extend(map(len, fields))
+        for row in fields:
+            tables.cells.extend(map(self.string, row))
+        tables.count += 1
+        return tables.count
+
+    def add_steps(self, steps):
+        column = self.steps
+        for step in steps:
+            column.lines.append(step.line)
+            self.titles.append(self.text(step.title))
+            self.step_tables.append(self.table(step.table))
+            self.step_texts.append(self.text(step.text))
+        column.count += len(steps)
+        self.tree.values.append(len(steps))
+
+    def tags(self, tags):
+        self.tree.values.append(len(tags))
+        self.tree.values.extend(map(self.string, tags))
+
+    def scenario(self, scenario):
+        tree = self.tree
+        outline = isinstance(scenario, Ast.ScenarioOutline)
+        tree.lines.append(scenario.line)
+        tree.values.append(SCENARIO_OUTLINE if outline else SCENARIO)
+        tree.values.append(self.text(scenario.title))
+        self.tags(scenario.tags)
+        tree.values.append(self.text(scenario.description))
+        self.add_steps(scenario.steps)
+        if outline:
+            examples = scenario.examples
+            if examples is None:
+                tree.values.append(0)
+                return
+            tree.values.append(1)
+            tree.lines.append(examples.line)
+            self.tags(examples.tags)
+            tree.values.append(self.table(examples.table))
+
+    def feature(self, feature):
+        tree = self.tree
+        tree.lines.append(feature.line)
+        tree.values.append(self.text(feature.title))
+        self.tags(feature.tags)
+        tree.values.append(self.text(feature.description))
+        background = feature.background
+        if background is None:
+            tree.values.append(0)
+        else:
+            tree.values.append(1)
+            tree.lines.append(background.line)
+            tree.values.append(self.text(background.title))
+            self.add_steps(background.steps)
+        tree.values.append(len(feature.scenarios))
+        for scenario in feature.scenarios:
+            self.scenario(scenario)
+
+    def getvalue(self):
+        strings = list(self.strings)
+        values = [len(strings)]
+        blob = '\x00'.join(strings)
+        if blob.count('\x00') == max(len(strings) - 1, 0):
+            flags = SEPARATED
+        else:
+            flags = 0
+            blob = ''.join(strings)
+            values.extend(map(len, strings))
+        blob = blob.encode('utf-8')
+
+        lines = []
+        for column in (self.texts, self.tables, self.steps):
+            encoded = encode_lines(column.lines)
+            lines.extend(encoded)
+            values.append(column.count)
+            values.append(len(encoded))
+            values.extend(column.values)
+            if column is self.tables:
+                values.append(len(column.cells))
+                values.extend(column.cells)
+        values.extend(self.titles)
+        values.extend(self.step_tables)
+        values.extend(self.step_texts)
+        values.extend(self.tree.values)
+        lines.extend(encode_lines(self.tree.lines))
+        lines = encode_varints(lines)
+
+        largest = max(values)
+        for typecode, limit in TYPECODES:
+            if largest < limit:
+                break
+        else:
+            raise ValueError('Feature too large to encode')
+        packed = array.array(typecode, values)
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        return b''.join([
+            HEADER.pack(MAGIC, FORMAT_VERSION, flags,
+                        typecode.encode('ascii'), len(blob), len(lines)),
+            blob, lines, packed.tobytes()])
+
+
+def dumps(feature):
+    "Returns the `Ast.Feature' `feature' encoded as bytes"
+    encoder = Encoder()
+    encoder.feature(feature)
+    return encoder.getvalue()
+
+
+def read_sections(data):
+    "Returns the strings, lines and values (both iterators) of encoded `data'"
+    if len(data) < HEADER.size:
+        raise ValueError('Truncated encoded feature')
+    magic, version, flags, typecode, blob_size, lines_size = HEADER.unpack_from(
+        data)
+    if magic != MAGIC:
+        raise ValueError('Not an encoded feature')
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported encoded feature version `{}\''.format(
+            version))
+    start = HEADER.size
+    blob = str(data[start:start + blob_size], 'utf-8')
+    start += blob_size
+    lines = decode_varints(data[start:start + lines_size])
+    start += lines_size
+
+    values = array.array(typecode.decode('ascii'))
+    values.frombytes(data[start:])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    values = iter(values.tolist())
+
+    count = next(values)
+    strings = [None]  # Ids start at one
+    if count and flags & SEPARATED:
+        strings.extend(blob.split('\x00'))
+    elif count:
+        ends = list(itertools.accumulate(itertools.islice(values, count)))
+        strings.extend(map(blob.__getitem__, map(slice, [0] + ends, ends)))
+    return strings, iter(lines), values
+
+
+class Decoder(object):
+    "Builds the nodes of each column, and then the tree that refers to them"
+
+    def __init__(self, strings, lines, values):
+        islice = itertools.islice
+        next_value = self.next_value = values.__next__
+        self.strings = strings
+        self.values = values
+        self.lines = lines
+        get_string = strings.__getitem__
+
+        count = next_value()
+        self.texts = texts = [None]
+        texts.extend(map(Ast.Text, self.take_lines(),
+                         map(get_string, islice(values, count))))
+
+        self.tables = tables = [None]
+        count = next_value()
+        table_lines = self.take_lines()
+        shapes = []
+        for _ in range(count):
+            rows, width = next_value(), next_value()
+            # Uniform tables give how many empty rows they end with, and
+            # the others the width of each row
+            shapes.append((rows, width, next_value() if width else list(
+                islice(values, rows))))
+        cells = list(map(get_string, islice(values, next_value())))
+        start = 0
+        for line, (rows, width, rest) in zip(table_lines, shapes):
+            if width:
+                end = start + (rows - rest) * width
+                fields = [cells[i:i + width] for i in range(start, end, width)]
+                if rest:
+                    fields.extend([] for _ in range(rest))
+                start = end
+            else:
+                fields = []
+                for width in rest:
+                    fields.append(cells[start:start + width])
+                    start += width
+            tables.append(Ast.Table(line, fields))
+
+        count = next_value()
+        step_lines = self.take_lines()
+        titles = list(map(texts.__getitem__, islice(values, count)))
+        step_tables = list(map(tables.__getitem__, islice(values, count)))
+        step_texts = list(map(texts.__getitem__, islice(values, count)))
+        self.steps = iter(list(map(
+            Ast.Step, step_lines, titles, step_tables, step_texts)))
+
+        self.next_line = iter(decode_lines(list(lines))).__next__
+
+    def take_lines(self):
+        return decode_lines(list(itertools.islice(self.lines, self.next_value())))
+
+    def take_steps(self):
+        return list(itertools.islice(self.steps, self.next_value()))
+
+    def tags(self):
+        return list(map(self.strings.__getitem__,
+                        itertools.islice(self.values, self.next_value())))
+
+    def scenarios(self, count):
+        # The loop that runs the most here, so everything it reads is inlined
+        next_value, next_line = self.next_value, self.next_line
+        texts, tables, get_string = self.texts, self.tables, self.strings.__getitem__
+        values, steps, islice = self.values, self.steps, itertools.islice
+        scenarios = []
+        for _ in range(count):
+            line = next_line()
+            kind = next_value()
+            title = texts[next_value()]
+            tags = list(map(get_string, islice(values, next_value())))
+            description = texts[next_value()]
+            scenario_steps = list(islice(steps, next_value()))
+            if kind == SCENARIO:
+                scenarios.append(Ast.Scenario(
+                    line, title, tags, description, scenario_steps))
+                continue
+            outline = Ast.ScenarioOutline(
+                line, title, tags, description, scenario_steps)
+            if next_value():
+                line = next_line()
+                tags = list(map(get_string, islice(values, next_value())))
+                outline.examples = Ast.Examples(line, tags, tables[next_value()])
+            scenarios.append(outline)
+        return scenarios
+
+    def feature(self):
+        next_value, texts = self.next_value, self.texts
+        line = self.next_line()
+        feature = Ast.Feature(line, texts[next_value()], self.tags(),
+                              texts[next_value()])
+        if next_value():
+            line = self.next_line()
+            feature.background = Ast.Background(
+                line, texts[next_value()], self.take_steps())
+        feature.scenarios = self.scenarios(next_value())
+        return feature
+
+
+def loads(data):
+    "Returns the `Ast.Feature' encoded in `data' by `dumps()'"
+    try:
+        strings, lines, values = read_sections(data)
+        return Decoder(strings, lines, values).feature()
+    except StopIteration:
+        raise ValueError('Truncated encoded feature')
+    except (struct.error, UnicodeDecodeError, IndexError) as error:
+        raise ValueError('Corrupted encoded feature: {}'.format(error))
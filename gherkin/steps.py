@@ -0,0 +1,280 @@
+# -*- coding: utf-8; -*-
+"""Matches steps against the patterns of step definitions
+
+    registry = StepRegistry()
+
+    @registry.step(r'I have (\\d+) apples')
+    def have_apples(count):
+        ...
+
+    match = registry.match_step(step)
+    match.definition.function(*match.args, **match.kwargs)
+
+Patterns must match the whole title of a step, after its keyword, and
+the first definition registered wins when more than one does.  Instead
+of trying every pattern on every step, definitions are indexed by the
+literal text their patterns start with in a trie, and the ones sharing
+the same literal prefix are compiled together into a single pattern of
+alternatives.  A step only tries the few combined patterns found along
+its path in the trie, and each distinct title is only matched once.
+"""
+
+import re
+
+
+## Languages only list the keyword that starts a scenario (`given'), so
+## the ones of the other steps are plain English unless told otherwise
+DEFAULT_KEYWORDS = ('Given', 'When', 'Then', 'And', 'But', '*')
+
+METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+## Combined patterns get slower with the number of groups they have to
+## keep track of, so only so many alternatives go in each of them
+MAX_ALTERNATIVES = 32
+
+## Patterns that can't be one of many alternatives
+STANDALONE = re.compile(r'\\[1-9]|\(\?P=|^\(\?[aiLmsux]+\)')
+
+
+def literal_prefix(pattern):
+    """Returns the text every string matched by `pattern' starts with
+
+    Only the characters before the first special one are taken, which
+    is all that's needed for the titles of steps, and nothing at all
+    when there are alternatives at the top level of the pattern.
+    """
+    depth = 0
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and not depth:
+            return ''
+
+    start = 1 if pattern.startswith('^') else 0
+    end = start
+    while end < len(pattern) and pattern[end] not in METACHARACTERS:
+        end += 1
+    if end < len(pattern) and pattern[end] in '*?{':
+        end -= 1  # The last character is optional
+    return pattern[start:end]
+
+
+def compile_keywords(keywords=DEFAULT_KEYWORDS):
+    "Returns a function that strips any of `keywords' off the start of a title"
+    if not keywords:
+        return lambda title: title
+    match = re.compile(r'(?:{})\s+'.format(
+        '|'.join(re.escape(keyword) for keyword in keywords))).match
+
+    def strip(title):
+        found = match(title)
+        return title[found.end():] if found is not None else title
+    return strip
+
+
+def without_groups(pattern):
+    "Returns `pattern' with its capturing groups turned into non capturing ones"
+    output = []
+    escaped = in_class = False
+    for index, char in enumerate(pattern):
+        output.append(char)
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(' and not pattern.startswith('?', index + 1):
+            output.append('?:')
+    return ''.join(output)
+
+
+class StepDefinition(object):
+    "A pattern and the function that implements the steps it matches"
+
+    def __init__(self, pattern, function=None, index=0, flags=0):
+        self.pattern = pattern
+        self.function = function
+        self.index = index  # Order of registration, the first one wins
+        self.regex = re.compile(pattern, flags)
+        self.prefix = '' if flags & re.IGNORECASE else literal_prefix(pattern)
+        # Named groups could clash, back references would point at the
+        # wrong group and global flags must start the combined pattern
+        self.combinable = not (self.regex.groupindex or
+                               STANDALONE.search(pattern))
+
+    def __repr__(self):
+        return 'StepDefinition({!r})'.format(self.pattern)
+
+
+class StepMatch(object):
+    "A definition that matched a step and the arguments captured from it"
+
+    def __init__(self, definition, args=(), kwargs=None):
+        self.definition = definition
+        self.args = args
+        self.kwargs = kwargs or {}
+
+    def __eq__(self, other):
+        return (isinstance(other, StepMatch) and
+                (self.definition, self.args, self.kwargs) ==
+                (other.definition, other.args, other.kwargs))
+
+    def __repr__(self):
+        return 'StepMatch({!r}, args={!r}, kwargs={!r})'.format(
+            self.definition, self.args, self.kwargs)
+
+
+class Alternatives(object):
+    """Definitions compiled together into a single pattern
+
+    Each pattern is wrapped in the only group it has in there, so the
+    `lastindex' of a match tells which definition matched.  Arguments
+    are then captured by the pattern of that definition alone.
+    """
+
+    def __init__(self, definitions, flags=0):
+        self.first = definitions[0].index
+        self.definitions = definitions
+        self.regex = re.compile('|'.join(
+            r'((?:{})\Z)'.format(without_groups(definition.pattern))
+            for definition in definitions), flags)
+
+    def match(self, text):
+        match = self.regex.match(text)
+        if match is None:
+            return None
+        definition = self.definitions[match.lastindex - 1]
+        return StepMatch(definition, definition.regex.fullmatch(text).groups())
+
+
+class Single(object):
+    "A definition whose pattern can't be combined with others"
+
+    def __init__(self, definition):
+        self.first = definition.index
+        self.definition = definition
+
+    def match(self, text):
+        match = self.definition.regex.fullmatch(text)
+        if match is None:
+            return None
+        kwargs = match.groupdict()
+        names = set(self.definition.regex.groupindex.values())
+        args = tuple(value for (number, value) in enumerate(match.groups(), 1)
+                     if number not in names)
+        return StepMatch(self.definition, args, kwargs)
+
+
+class StepRegistry(object):
+    """Step definitions and the index used to match steps against them
+
+    The `keywords' that start the title of a step are left out of the
+    text patterns are matched against, pass an empty tuple to match the
+    whole title.  The index is built on the first match after adding
+    definitions, and results are remembered per distinct title.
+    """
+
+    def __init__(self, keywords=DEFAULT_KEYWORDS, flags=0):
+        self.definitions = []
+        self.flags = flags
+        self.text = compile_keywords(keywords)
+        self.trie = None
+        self.matches = {}
+
+    def add(self, pattern, function=None):
+        "Registers a definition of `pattern' and returns it"
+        definition = StepDefinition(
+            pattern, function, len(self.definitions), self.flags)
+        self.definitions.append(definition)
+        self.trie = None
+        self.matches.clear()
+        return definition
+
+    def step(self, pattern):
+        "Decorator that registers the function it's applied to"
+        def decorator(function):
+            self.add(pattern, function)
+            return function
+        return decorator
+
+    def build(self):
+        """Indexes the definitions in a trie of their literal prefixes
+
+        The nodes are dictionaries of characters, and the alternatives
+        of the definitions that end at a node are kept under `None'.
+        """
+        prefixes = {}
+        for definition in self.definitions:
+            prefixes.setdefault(definition.prefix, []).append(definition)
+
+        self.trie = {}
+        for prefix, definitions in prefixes.items():
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            groups = node[None] = []
+            combinable = [d for d in definitions if d.combinable]
+            for start in range(0, len(combinable), MAX_ALTERNATIVES):
+                groups.append(Alternatives(
+                    combinable[start:start + MAX_ALTERNATIVES], self.flags))
+            groups.extend(Single(d) for d in definitions if not d.combinable)
+        return self.trie
+
+    def match(self, text):
+        "Returns the `StepMatch' of `text', or None when no definition matches"
+        try:
+            return self.matches[text]
+        except KeyError:
+            pass
+
+        # Definitions whose literal prefix the text starts with
+        node = self.trie if self.trie is not None else self.build()
+        candidates = list(node.get(None, ()))
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            candidates.extend(node.get(None, ()))
+
+        found = None
+        for group in candidates:
+            if found is not None and group.first > found.definition.index:
+                continue  # Only has definitions registered after the one found
+            match = group.match(text)
+            if match is not None and (
+                    found is None or
+                    match.definition.index < found.definition.index):
+                found = match
+        self.matches[text] = found
+        return found
+
+    def match_step(self, step):
+        "Returns the `StepMatch' of an `Ast.Step', or None when it's undefined"
+        return self.match(self.text(step.title.text))
+
+    def match_feature(self, feature):
+        """Yields (step, match) for each step of `feature'
+
+        Outlines are taken as they are, expand them with
+        `gherkin.outlines' to match the steps of their examples.
+        """
+        scenarios = list(feature.scenarios or ())
+        if feature.background is not None:
+            scenarios.insert(0, feature.background)
+        for scenario in scenarios:
+            for step in scenario.steps or ():
+                yield step, self.match_step(step)
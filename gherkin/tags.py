@@ -0,0 +1,285 @@
+# -*- coding: utf-8; -*-
+"""Selects scenarios by their tags
+
+Tag expressions combine tags with `and', `or', `not' and parenthesis:
+
+    >>> expression = compile_expression('@smoke and not @slow')
+    >>> expression.match(['smoke', 'db'])
+    True
+
+A `TagIndex' maps each tag to the scenarios that have it, so a whole
+suite can be filtered without parsing it again:
+
+    $ python -m gherkin.bulk features/ --index tags.json
+    $ python -m gherkin.tags tags.json '@smoke and not @slow'
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+
+INDEX_VERSION = 1
+
+TOKENS = re.compile(r'\s*(?:([()])|([^\s()]+))')
+
+
+class Expression(object):
+    """A node of a compiled tag expression
+
+    Nodes have `match(tags)', which tells whether a scenario with `tags'
+    is selected, and `select(index)', which returns the ids of the
+    scenarios of a `TagIndex' that are selected.
+    """
+
+
+class Everything(Expression):
+
+    def match(self, tags):
+        return True
+
+    def select(self, index):
+        return index.everything()
+
+
+class Tag(Expression):
+
+    def __init__(self, name):
+        self.name = name
+
+    def match(self, tags):
+        return self.name in tags
+
+    def select(self, index):
+        return index.tags.get(self.name, frozenset())
+
+
+class Not(Expression):
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def match(self, tags):
+        return not self.operand.match(tags)
+
+    def select(self, index):
+        return index.everything() - self.operand.select(index)
+
+
+class And(Expression):
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def match(self, tags):
+        return self.left.match(tags) and self.right.match(tags)
+
+    def select(self, index):
+        return self.left.select(index) & self.right.select(index)
+
+
+class Or(Expression):
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    def match(self, tags):
+        return self.left.match(tags) or self.right.match(tags)
+
+    def select(self, index):
+        return self.left.select(index) | self.right.select(index)
+
+
+class ExpressionParser(object):
+    "Parses tag expressions, where `not' binds tighter than `and', and `and' tighter than `or'"
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKENS.match(text, position)
+            self.tokens.append(match.group(1) or match.group(2))
+            position = match.end()
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+
+    def next_(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError(
+                'Unexpected end of the tag expression `{}\''.format(self.text))
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return Everything()
+        expression = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError('Unexpected `{}\' in the tag expression `{}\''.format(
+                self.peek(), self.text))
+        return expression
+
+    def parse_or(self):
+        expression = self.parse_and()
+        while self.peek() == 'or':
+            self.next_()
+            expression = Or(expression, self.parse_and())
+        return expression
+
+    def parse_and(self):
+        expression = self.parse_not()
+        while self.peek() == 'and':
+            self.next_()
+            expression = And(expression, self.parse_not())
+        return expression
+
+    def parse_not(self):
+        token = self.next_()
+        if token == 'not':
+            return Not(self.parse_not())
+        elif token == '(':
+            expression = self.parse_or()
+            if self.next_() != ')':
+                raise ValueError(
+                    'Missing `)\' in the tag expression `{}\''.format(self.text))
+            return expression
+        elif token.startswith('@') and len(token) > 1:
+            return Tag(token[1:])
+        raise ValueError('Unexpected `{}\' in the tag expression `{}\''.format(
+            token, self.text))
+
+
+def compile_expression(text):
+    "Returns the `Expression' written in `text'; an empty one selects everything"
+    return ExpressionParser(text).parse()
+
+
+def scenario_tags(feature, scenario):
+    "Returns all the tags a scenario has, including the ones it inherits"
+    tags = set(feature.tags)
+    tags.update(scenario.tags)
+    examples = getattr(scenario, 'examples', None)
+    if examples is not None:
+        tags.update(examples.tags)
+    return tags
+
+
+class TagIndex(object):
+    """Maps each tag to the scenarios that have it
+
+    Scenarios are identified by the path of their file and their line.
+    The size and modification time of each file are kept as well, so
+    `outdated()' can tell which files changed since they were indexed.
+    """
+
+    def __init__(self):
+        self.files = []  # [path, size, mtime] of each file
+        self.scenarios = []  # (file id, line) of each scenario
+        self.tags = {}  # tag -> set of scenario ids
+        self._everything = None
+
+    def add(self, path, feature):
+        "Indexes the scenarios of `feature', found in the file at `path'"
+        info = os.stat(path)
+        file_id = len(self.files)
+        self.files.append([path, info.st_size, info.st_mtime])
+        for scenario in feature.scenarios:
+            scenario_id = len(self.scenarios)
+            self.scenarios.append((file_id, scenario.line))
+            for tag in scenario_tags(feature, scenario):
+                self.tags.setdefault(tag, set()).add(scenario_id)
+        self._everything = None
+
+    def everything(self):
+        if self._everything is None:
+            self._everything = frozenset(range(len(self.scenarios)))
+        return self._everything
+
+    def select(self, expression):
+        "Returns the (path, line) of the scenarios selected by `expression'"
+        if not isinstance(expression, Expression):
+            expression = compile_expression(expression)
+        return [(self.files[self.scenarios[i][0]][0], self.scenarios[i][1])
+                for i in sorted(expression.select(self))]
+
+    def outdated(self):
+        "Returns the paths of the indexed files that changed or are gone"
+        paths = []
+        for path, size, mtime in self.files:
+            try:
+                info = os.stat(path)
+            except OSError:
+                paths.append(path)
+                continue
+            if (info.st_size, info.st_mtime) != (size, mtime):
+                paths.append(path)
+        return paths
+
+    def save(self, path):
+        with open(path, 'w') as fileobj:
+            json.dump({
+                'version': INDEX_VERSION,
+                'files': self.files,
+                'scenarios': self.scenarios,
+                'tags': dict((tag, sorted(ids))
+                             for (tag, ids) in self.tags.items()),
+            }, fileobj)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fileobj:
+            data = json.load(fileobj)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError('Unsupported tag index version `{}\''.format(
+                data.get('version')))
+        index = cls()
+        index.files = data['files']
+        index.scenarios = [tuple(scenario) for scenario in data['scenarios']]
+        index.tags = dict((tag, set(ids)) for (tag, ids) in data['tags'].items())
+        return index
+
+
+def build_index(results):
+    "Returns a `TagIndex' of the features parsed by `gherkin.bulk'"
+    index = TagIndex()
+    for result in results:
+        if result.feature is not None:
+            index.add(result.path, result.feature)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m gherkin.tags',
+        description='Lists the scenarios a tag expression selects')
+    parser.add_argument('index', help='tag index written by gherkin.bulk')
+    parser.add_argument('expression', help="like '@smoke and not @slow'")
+    args = parser.parse_args(argv)
+
+    try:
+        index = TagIndex.load(args.index)
+        selected = index.select(args.expression)
+    except ValueError as error:
+        sys.stderr.write('{}\n'.format(error))
+        return 2
+    for path, line in selected:
+        sys.stdout.write('{}:{}\n'.format(path, line))
+    outdated = index.outdated()
+    if outdated:
+        sys.stderr.write('{} files changed since they were indexed\n'.format(
+            len(outdated)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
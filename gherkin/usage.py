@@ -0,0 +1,201 @@
+# -*- coding: utf-8; -*-
+"""Tells how often and where each step is used across a suite
+
+Features are added one at a time as they're parsed and are never kept,
+only a table of the distinct steps is:
+
+    $ python -m gherkin.bulk features/ --usage usage.json
+    $ python -m gherkin.usage usage.json --patterns steps.txt
+
+Steps written with different keywords (`Given x' and `And x') are the
+same step.  With a file of step definition patterns, one per line, the
+steps nobody defined and the definitions nobody uses are listed too.
+"""
+
+from array import array
+import argparse
+import json
+import re
+import sys
+
+from .steps import DEFAULT_KEYWORDS, StepRegistry, compile_keywords
+
+
+USAGE_VERSION = 1
+
+
+class StepUsage(object):
+    """A deduplicated table of the steps found in features
+
+    Each distinct step gets an id, and the ids index `texts', `counts'
+    and `postings'.  The postings of a step are the (file id, line) of
+    each one of its uses, flattened into an array of its own, so they
+    take 8 bytes per use; without `postings' the table only grows with
+    the number of distinct steps.
+    """
+
+    def __init__(self, keywords=DEFAULT_KEYWORDS, postings=True):
+        self.strip = compile_keywords(keywords)
+        self.files = []  # Path of each file
+        self.ids = {}  # text -> step id
+        self.texts = []
+        self.counts = array('I')
+        self.postings = [] if postings else None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, path, feature):
+        "Counts the steps of `feature', found in the file at `path'"
+        file_id = len(self.files)
+        self.files.append(path)
+        scenarios = list(feature.scenarios or ())
+        if feature.background is not None:
+            scenarios.insert(0, feature.background)
+
+        ids, strip, counts, postings = (
+            self.ids, self.strip, self.counts, self.postings)
+        for scenario in scenarios:
+            for step in scenario.steps or ():
+                text = strip(step.title.text)
+                step_id = ids.get(text)
+                if step_id is None:
+                    step_id = ids[text] = len(self.texts)
+                    self.texts.append(text)
+                    counts.append(0)
+                    if postings is not None:
+                        postings.append(array('I'))
+                counts[step_id] += 1
+                if postings is not None:
+                    postings[step_id].extend((file_id, step.line))
+
+    def where(self, text):
+        "Returns the (path, line) of each use of the step `text'"
+        if self.postings is None:
+            raise ValueError('Postings were not kept')
+        step_id = self.ids.get(self.strip(text))
+        if step_id is None:
+            return []
+        uses = self.postings[step_id]
+        return [(self.files[uses[i]], uses[i + 1])
+                for i in range(0, len(uses), 2)]
+
+    def duplicated(self, minimum=2):
+        "Returns (text, count) of the steps used at least `minimum' times, most used first"
+        counts = self.counts
+        steps = [step_id for step_id in range(len(counts))
+                 if counts[step_id] >= minimum]
+        steps.sort(key=lambda step_id: (-counts[step_id], self.texts[step_id]))
+        return [(self.texts[step_id], counts[step_id]) for step_id in steps]
+
+    def undefined(self, registry):
+        "Returns the texts of the steps no definition of a `StepRegistry' matches"
+        return [text for text in self.texts if registry.match(text) is None]
+
+    def unused(self, registry):
+        "Returns the definitions of a `StepRegistry' that match no step"
+        used = set()
+        for text in self.texts:
+            match = registry.match(text)
+            if match is not None:
+                used.add(match.definition.index)
+        return [definition for definition in registry.definitions
+                if definition.index not in used]
+
+    def save(self, path):
+        steps = []
+        for step_id, text in enumerate(self.texts):
+            step = [text, self.counts[step_id]]
+            if self.postings is not None:
+                step.append(self.postings[step_id].tolist())
+            steps.append(step)
+        with open(path, 'w') as fileobj:
+            json.dump({
+                'version': USAGE_VERSION,
+                'files': self.files,
+                'postings': self.postings is not None,
+                'steps': steps,
+            }, fileobj)
+
+    @classmethod
+    def load(cls, path, keywords=DEFAULT_KEYWORDS):
+        with open(path) as fileobj:
+            data = json.load(fileobj)
+        if data.get('version') != USAGE_VERSION:
+            raise ValueError('Unsupported step usage version `{}\''.format(
+                data.get('version')))
+        usage = cls(keywords, data['postings'])
+        usage.files = data['files']
+        for step in data['steps']:
+            usage.ids[step[0]] = len(usage.texts)
+            usage.texts.append(step[0])
+            usage.counts.append(step[1])
+            if usage.postings is not None:
+                usage.postings.append(array('I', step[2]))
+        return usage
+
+
+def build_usage(results, postings=True):
+    "Returns the `StepUsage' of the features parsed by `gherkin.bulk'"
+    usage = StepUsage(postings=postings)
+    for result in results:
+        if result.feature is not None:
+            usage.add(result.path, result.feature)
+    return usage
+
+
+def load_patterns(path):
+    "Returns a `StepRegistry' of the patterns found in a file, one per line"
+    registry = StepRegistry()
+    with open(path) as fileobj:
+        for number, line in enumerate(fileobj, 1):
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            try:
+                registry.add(line)
+            except re.error as error:
+                raise ValueError('Invalid pattern in line {} of `{}\': {}'.format(
+                    number, path, error))
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m gherkin.usage',
+        description='Reports the steps used across a suite')
+    parser.add_argument('usage', help='step usage written by gherkin.bulk')
+    parser.add_argument(
+        '-n', '--top', type=int, default=20,
+        help='number of the most used steps to list (default: 20)')
+    parser.add_argument(
+        '-p', '--patterns', metavar='FILE',
+        help='step definition patterns, one per line')
+    args = parser.parse_args(argv)
+
+    try:
+        usage = StepUsage.load(args.usage)
+        registry = load_patterns(args.patterns) if args.patterns else None
+    except ValueError as error:
+        sys.stderr.write('{}\n'.format(error))
+        return 2
+
+    write = sys.stdout.write
+    write('{} steps, {} distinct, in {} files\n'.format(
+        sum(usage.counts), len(usage), len(usage.files)))
+    for text, count in usage.duplicated()[:args.top]:
+        write('{:>8} {}\n'.format(count, text))
+    if registry is not None:
+        undefined = usage.undefined(registry)
+        write('Undefined steps: {}\n'.format(len(undefined)))
+        for text in undefined:
+            write('  {}\n'.format(text))
+        unused = usage.unused(registry)
+        write('Unused definitions: {}\n'.format(len(unused)))
+        for definition in unused:
+            write('  {}\n'.format(definition.pattern))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8; -*-
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import os
+import shutil
+import threading
+
+import gherkin
+from gherkin import aio
+
+from .test_bulk import make_tree
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    "Remembers the most tasks it ever had running at once"
+
+    def __init__(self):
+        super(CountingExecutor, self).__init__(4)
+        self.lock = threading.Lock()
+        self.running = self.most = 0
+
+    def submit(self, function, *args):
+        def run():
+            with self.lock:
+                self.running += 1
+                self.most = max(self.most, self.running)
+            try:
+                return function(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+        return super(CountingExecutor, self).submit(run)
+
+
+def collect(results):
+    async def consume():
+        return [result async for result in results]
+    return asyncio.run(consume())
+
+
+def test_parse_file():
+    "aio.parse_file() Should parse a file like gherkin.parse_file() does"
+
+    # Given a directory tree with a feature file
+    root = make_tree()
+    path = os.path.join(root, 'b.feature')
+
+    try:
+        # When it's parsed in a thread and in another process
+        feature = asyncio.run(aio.parse_file(path))
+        with ProcessPoolExecutor(1) as executor:
+            remote = asyncio.run(aio.parse_file(path, executor=executor))
+
+        # Then we see both are the same feature
+        feature.should.equal(gherkin.parse_file(path))
+        remote.should.equal(feature)
+    finally:
+        shutil.rmtree(root)
+
+
+def test_parse_reader():
+    "aio.parse_reader() Should parse everything a stream reader has"
+
+    async def parse():
+        reader = asyncio.StreamReader()
+        reader.feed_data('Feature: Ação\n'.encode('latin-1'))
+        reader.feed_eof()
+        return await aio.parse_reader(reader, encoding='latin-1')
+
+    asyncio.run(parse()).title.text.should.equal('Ação')
+
+
+def test_parse_tree():
+    "aio.parse_tree() Should yield a result per file, never parsing too many at once"
+
+    # Given a directory tree with a few feature files
+    root = make_tree()
+    executor = CountingExecutor()
+
+    try:
+        # When it's parsed with a bounded concurrency
+        results = collect(aio.parse_tree(root, 2, executor=executor))
+    finally:
+        shutil.rmtree(root)
+        executor.shutdown()
+
+    # Then we see every file has its result, errors included
+    sorted(os.path.relpath(result.path, root) for result in results).should.equal(
+        ['a.feature', 'b.feature', os.path.join('sub', 'c.feature'),
+         os.path.join('sub', 'd.feature')])
+    [result.error for result in results if result.error].should.have.length_of(1)
+
+    # And that no more than two files were parsed at once
+    executor.most.should.be.within(1, 2)
+
+
+def test_parse_paths_stop_early():
+    "aio.parse_paths() Should only take the paths it has room for"
+
+    # Given an endless generator of paths
+    root = make_tree()
+    path = os.path.join(root, 'b.feature')
+    taken = []
+
+    def paths():
+        while True:
+            taken.append(path)
+            yield path
+
+    async def first():
+        results = aio.parse_paths(paths(), concurrency=3)
+        result = await results.__anext__()
+        await results.aclose()
+        return result
+
+    try:
+        # When only the first result is read
+        result = asyncio.run(first())
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see only a few paths were taken
+    result.feature.title.text.should.equal('B')
+    len(taken).should.be.within(3, 4)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8; -*-
+
+import os
+import shutil
+import tempfile
+
+from gherkin import Ast, bulk
+from gherkin.cache import ParseCache
+
+
+def write_features(root, files):
+    for name, content in files.items():
+        path = os.path.join(root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as fileobj:
+            fileobj.write(content)
+
+
+def make_tree():
+    root = tempfile.mkdtemp()
+    write_features(root, {
+        'b.feature': 'Feature: B\n  Scenario: One\n    Given b\n',
+        'a.feature': 'Feature: A\n',
+        'sub/c.feature': 'Scenario: Not a feature\n',
+        'sub/d.feature': 'Feature: D\n',
+        'notes.txt': 'Not even gherkin',
+    })
+    return root
+
+
+def test_find_features():
+    "find_features() Should list the feature files in a stable order"
+
+    # Given a directory tree with a few feature files
+    root = make_tree()
+
+    try:
+        # When we look for features
+        paths = bulk.find_features(root)
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see they're sorted and other files were ignored
+    [os.path.relpath(p, root) for p in paths].should.equal([
+        'a.feature', 'b.feature',
+        os.path.join('sub', 'c.feature'), os.path.join('sub', 'd.feature'),
+    ])
+
+
+def test_batches():
+    "batches() Should group paths by the size of their files"
+
+    # Given three files of 10 bytes each
+    root = tempfile.mkdtemp()
+    write_features(root, dict(('{}.feature'.format(i), 'x' * 10) for i in range(3)))
+    paths = bulk.find_features(root)
+
+    try:
+        # When they're grouped in batches of 20 bytes
+        groups = list(bulk.batches(paths, batch_size=20))
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see two files fit in the first batch
+    groups.should.equal([paths[:2], paths[2:]])
+
+
+def test_parse_tree():
+    "parse_tree() Should report errors per file and keep going"
+
+    for workers in (1, 2):
+        # Given a directory tree with one broken feature file
+        root = make_tree()
+
+        try:
+            # When the tree is parsed with small batches
+            results = list(bulk.parse_tree(root, workers, batch_size=1))
+        finally:
+            shutil.rmtree(root)
+
+        # Then we see every feature file was parsed in order
+        [os.path.basename(r.path) for r in results].should.equal([
+            'a.feature', 'b.feature', 'c.feature', 'd.feature'])
+        results[0].feature.should.equal(
+            Ast.Feature(line=1, title=Ast.Text(line=1, text='A')))
+
+        # And the broken one has an error instead of a feature
+        results[2].feature.should.be.none
+        results[2].error.should.equal(
+            "SyntaxError: Feature expected in the beginning "
+            "of the file, found `Scenario' though.")
+        results[3].error.should.be.none
+
+
+def test_parse_paths_missing_file():
+    "parse_paths() Should report files that are gone as errors and keep going"
+
+    for workers in (1, 2):
+        # Given a directory tree and a path to a file that doesn't exist
+        root = make_tree()
+        paths = [os.path.join(root, 'gone.feature'),
+                 os.path.join(root, 'a.feature')]
+
+        try:
+            # When the paths are parsed
+            results = list(bulk.parse_paths(paths, workers))
+        finally:
+            shutil.rmtree(root)
+
+        # Then we see the missing file got an error, and the other a feature
+        results[0].error.should.contain('FileNotFoundError')
+        results[1].feature.title.text.should.equal('A')
+
+
+def test_parse_tree_recover():
+    "parse_tree() Should report every error of each file when recovering"
+
+    for workers in (1, 2):
+        # Given a directory tree with one broken feature file
+        root = make_tree()
+
+        try:
+            # When the tree is parsed recovering from errors
+            results = list(bulk.parse_tree(root, workers, recover=True))
+        finally:
+            shutil.rmtree(root)
+
+        # Then we see the broken file has its diagnostics and a feature
+        [len(r.diagnostics) for r in results].should.equal([0, 0, 1, 0])
+        results[2].diagnostics[0].line.should.equal(1)
+        results[2].error.should.be.none
+        results[2].feature.scenarios[0].title.text.should.equal(
+            'Not a feature')
+
+
+def test_parse_tree_with_cache():
+    "parse_tree() Should load unchanged files from the cache"
+
+    # Given a directory tree and an empty cache
+    root = make_tree()
+    cache = ParseCache(tempfile.mkdtemp())
+
+    try:
+        # When the tree is parsed twice
+        cold = list(bulk.parse_tree(root, workers=2, cache=cache))
+        warm = list(bulk.parse_tree(root, workers=2, cache=cache))
+    finally:
+        shutil.rmtree(root)
+        shutil.rmtree(cache.directory)
+
+    # Then we see only the broken file missed the cache the second time
+    [r.cached for r in cold].should.equal([False, False, None, False])
+    [r.cached for r in warm].should.equal([True, True, None, True])
+    (cache.hits, cache.misses).should.equal((3, 3))
+
+    # And that the features are the same
+    [r.feature for r in warm].should.equal([r.feature for r in cold])
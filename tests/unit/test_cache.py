@@ -0,0 +1,125 @@
+# -*- coding: utf-8; -*-
+
+import os
+import shutil
+import tempfile
+
+import gherkin
+from gherkin.cache import ParseCache
+
+
+FEATURE = b'Feature: Cached\n  Scenario: Twice\n    Given it was parsed once\n'
+
+
+def test_cache_hits_and_misses():
+    "ParseCache.parse() Should only parse content it hasn't seen before"
+
+    # Given an empty cache
+    directory = tempfile.mkdtemp()
+    cache = ParseCache(directory)
+
+    try:
+        # When the same content is parsed twice
+        first = cache.parse(FEATURE)
+        second = ParseCache(directory).parse(FEATURE)
+        third = cache.parse(FEATURE)
+    finally:
+        shutil.rmtree(directory)
+
+    # Then we see the first one was a miss and the other a hit
+    (cache.hits, cache.misses).should.equal((1, 1))
+
+    # And that every call returned the right feature
+    expected = gherkin.parse(FEATURE.decode('utf-8'))
+    first.should.equal(expected)
+    second.should.equal(expected)
+    third.should.equal(expected)
+
+
+def test_cache_key_depends_on_parser_version():
+    "ParseCache.key() Should change with the version of the parser"
+
+    # Given two caches created with different parser versions
+    cache = ParseCache('.')
+    gherkin_version = gherkin.cache.__version__
+    gherkin.cache.__version__ = 'another'
+    try:
+        other = ParseCache('.')
+    finally:
+        gherkin.cache.__version__ = gherkin_version
+
+    # Then we see they don't share entries
+    cache.key(FEATURE).shouldnt.equal(other.key(FEATURE))
+
+
+def test_cache_key_depends_on_encoding():
+    "ParseCache.parse() Should not share features of content read with other encodings"
+
+    # Given a cache and some content that's valid in two encodings
+    directory = tempfile.mkdtemp()
+    cache = ParseCache(directory)
+    content = 'Feature: Ação\n'.encode('utf-8')
+
+    try:
+        # When it's parsed with each one of them
+        first = cache.parse(content, encoding='utf-8')
+        second = cache.parse(content, encoding='latin-1')
+        third = cache.parse(content, encoding='UTF8')
+    finally:
+        shutil.rmtree(directory)
+
+    # Then we see each encoding got its own feature, whatever its name
+    first.title.text.should.equal('Ação')
+    second.title.text.should.equal(content.decode('latin-1')[9:-1])
+    third.should.equal(first)
+    (cache.hits, cache.misses).should.equal((1, 2))
+
+
+def test_cache_put_twice():
+    "ParseCache.put() Should not count an entry it replaces twice"
+
+    # Given a cache holding one entry
+    directory = tempfile.mkdtemp()
+    cache = ParseCache(directory)
+    feature = cache.parse(FEATURE)
+    size = cache.size
+
+    try:
+        # When the same entry is stored again
+        cache.put(FEATURE, feature)
+        cache.put(FEATURE, feature)
+
+        # Then we see the size is still the one on disk
+        cache.size.should.equal(size)
+        cache.size.should.equal(cache.disk_usage())
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cache_eviction():
+    "ParseCache.put() Should evict the least recently used entries"
+
+    # Given a cache holding two entries
+    directory = tempfile.mkdtemp()
+    cache = ParseCache(directory)
+    contents = [FEATURE.replace(b'Twice', str(i).encode('utf-8')) for i in range(3)]
+    cache.parse(contents[0])
+    cache.parse(contents[1])
+
+    # And the first one was used long after the second one
+    old = os.path.getmtime(cache.path(cache.key(contents[1]))) - 100
+    os.utime(cache.path(cache.key(contents[1])), (old, old))
+    cache.parse(contents[0])
+
+    try:
+        # When the cache is limited to the size of two entries and a
+        # third one comes in
+        cache.max_size = cache.size
+        cache.parse(contents[2])
+
+        # Then we see the second entry was evicted
+        cache.get(contents[1]).should.be.none
+        cache.get(contents[0]).shouldnt.be.none
+        cache.get(contents[2]).shouldnt.be.none
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8; -*-
+
+import io
+import os
+import shutil
+import tempfile
+
+import gherkin
+from gherkin import formatter
+
+from .test_bulk import write_features
+
+
+CANONICAL = '''# language: pt-br
+
+@slow @db
+Funcionalidade: Comprar maçãs
+  Para comer mais frutas
+
+  Contexto:
+    Dado que estou logado
+
+  @a
+  Cenário: Comprar
+    Dado que tenho 2 maçãs
+    E os preços:
+      | fruta | preço |
+      | maçã  | 1     |
+    Então vejo:
+      """
+      ok
+        recibo
+      """
+
+  Esquema do Cenário: Vários
+    Dado <n> maçãs
+
+    Exemplos:
+      | n  |
+      | 10 |
+'''
+
+MESSY = '''# language: pt-br
+@slow   @db
+Funcionalidade:   Comprar maçãs
+      Para comer
+  mais frutas
+ Contexto:
+        Dado que estou logado
+
+@a
+Cenário: Comprar
+   Dado que tenho 2 maçãs
+   E os preços
+   | fruta | preço|
+   |maçã|  1|
+
+   Então vejo:
+        """
+        ok
+          recibo
+        """
+  Esquema do Cenário: Vários
+    Dado <n> maçãs
+  Exemplos:
+    | n |
+    | 10 |
+'''
+
+
+def test_format_feature():
+    "format_feature() Should write a feature back as the same canonical text"
+
+    # Given a feature in canonical Gherkin
+    feature = gherkin.parse(CANONICAL)
+    header, language = formatter.read_header(CANONICAL)
+
+    # When it's written to a file object
+    output = io.StringIO()
+    formatter.format_feature(feature, output, language, header)
+
+    # Then we see the text is the same it was parsed from
+    header.should.equal(['# language: pt-br'])
+    output.getvalue().should.equal(CANONICAL)
+
+
+def test_format_text():
+    "format_text() Should normalize indentation, blank lines and tables"
+
+    formatter.format_text(MESSY).should.equal(CANONICAL)
+    formatter.format_text(
+        'Feature: F\n  Scenario: S\n    Given a:\n    """"""\n').should.equal(
+        'Feature: F\n\n  Scenario: S\n    Given a:\n      """"""\n')
+
+
+def test_read_header():
+    "read_header() Should keep the comments before the feature as they were written"
+
+    formatter.read_header(
+        '#   see: http://example.com\n\n# language:  pt-br\nFuncionalidade: F\n'
+    ).should.equal(
+        (['#   see: http://example.com', '# language:  pt-br'], 'pt-br'))
+    formatter.read_header('Feature: F\n').should.equal(([], 'en'))
+    formatter.read_header(
+        '# language: pt-br \r\nFuncionalidade: F\r\n').should.equal(
+        (['# language: pt-br'], 'pt-br'))
+
+
+def test_check():
+    "check() Should return the number of the first line that differs"
+
+    # Given a feature in canonical Gherkin
+    feature = gherkin.parse(CANONICAL)
+    lines = CANONICAL.splitlines(True)
+
+    # When it's checked against its own text and changed ones;
+    # Then we see the first line that differs, if any
+    formatter.check(feature, lines, 'pt-br', ['# language: pt-br']).should.be.none
+    formatter.check(feature, lines, 'pt-br').should.equal(1)
+    lines[13] = '      | maçã | 1 |\n'
+    formatter.check(feature, lines, 'pt-br', ['# language: pt-br']).should.equal(14)
+    formatter.check(feature, lines[:-1], 'pt-br', ['# language: pt-br']).should.equal(14)
+    formatter.check(feature, CANONICAL.splitlines(True) + ['\n'], 'pt-br',
+                    ['# language: pt-br']).should.equal(len(lines) + 1)
+
+
+def test_main():
+    "formatter.main() Should rewrite the files that aren't canonical, unless checking"
+
+    # Given a directory with a canonical, a messy and a broken feature
+    root = tempfile.mkdtemp()
+    try:
+        write_features(root, {
+            'a.feature': CANONICAL,
+            'b.feature': MESSY,
+            'c.feature': 'Scenario: Not a feature\n',
+        })
+        messy = os.path.join(root, 'b.feature')
+
+        # When they're checked; Then we see nothing was rewritten
+        formatter.main([root, '--check']).should.equal(2)
+        formatter.read_text(messy).should.equal(MESSY)
+
+        # And when they're formatted; Then we see the messy one is canonical
+        formatter.main([root]).should.equal(2)
+        formatter.read_text(messy).should.equal(CANONICAL)
+        formatter.main([os.path.join(root, 'a.feature'), messy, '--check']
+                       ).should.equal(0)
+
+        # And that only files not canonical make checking fail
+        write_features(root, {'b.feature': MESSY})
+        formatter.main([messy, '--check']).should.equal(1)
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8; -*-
+
+import gherkin
+from gherkin.incremental import Document
+
+
+FEATURE = '''Feature: Edit me
+  Background:
+    Given the app
+
+  @a
+  Scenario: One
+    Given first
+
+  Scenario: Two
+    Given second
+      """
+      doc
+      """
+
+  @b
+  Scenario: Three
+    Given third
+'''
+
+
+def edit(doc, old, new):
+    start = doc.text.index(old)
+    return doc.edit(start, start + len(old), new)
+
+
+def test_document_parse():
+    "Document() Should parse its text and know where each scenario starts"
+
+    # Given a document
+    doc = Document(FEATURE)
+
+    # Then we see the feature was parsed
+    doc.feature.should.equal(gherkin.parse(FEATURE))
+
+    # And that the lines of the tags count as the start of scenarios
+    doc.starts.should.equal([5, 9, 15])
+
+
+def test_document_edit_reuses_scenarios():
+    "Document.edit() Should only parse the scenarios touched by the edit"
+
+    # Given a document
+    doc = Document(FEATURE)
+    one, two, three = doc.feature.scenarios
+
+    # When a step of the first scenario is changed
+    feature = edit(doc, 'Given first', 'Given the first')
+
+    # Then we see the same feature a full parse would find
+    feature.should.equal(gherkin.parse(doc.text))
+
+    # And that the scenario after the edited one was parsed again, but
+    # not the ones further down
+    feature.scenarios[0].should_not.be(one)
+    feature.scenarios[2].should.be(three)
+
+
+def test_document_edit_shifts_lines():
+    "Document.edit() Should move copies of the scenarios below an edit adding lines"
+
+    # Given a document
+    doc = Document(FEATURE)
+    three = doc.feature.scenarios[2]
+
+    # When two steps are added to the first scenario
+    feature = edit(doc, 'Given first\n', 'Given first\n    And more\n    And more\n')
+
+    # Then we see the scenarios below were moved two lines down
+    feature.should.equal(gherkin.parse(doc.text))
+    feature.scenarios[2].line.should.equal(18)
+    feature.scenarios[2].steps[0].line.should.equal(19)
+    doc.starts.should.equal([5, 11, 17])
+
+    # And that the nodes of the feature before the edit were left alone
+    three.line.should.equal(16)
+    three.steps[0].line.should.equal(17)
+    feature.scenarios[2].title.text.should.be(three.title.text)
+
+
+def test_document_edit_new_scenario():
+    "Document.edit() Should find scenarios added by an edit"
+
+    # Given a document
+    doc = Document(FEATURE)
+
+    # When a scenario is typed in between two others
+    feature = edit(doc, '  @b\n', '  Scenario: New\n    Given new\n\n  @b\n')
+
+    # Then we see it was added
+    feature.should.equal(gherkin.parse(doc.text))
+    [s.title.text for s in feature.scenarios].should.equal(
+        ['One', 'Two', 'New', 'Three'])
+    doc.starts.should.equal([5, 9, 15, 18])
+
+
+def test_document_edit_header():
+    "Document.edit() Should parse everything again when the header changes"
+
+    # Given a document
+    doc = Document(FEATURE)
+
+    # When the background is changed
+    feature = edit(doc, 'Given the app', 'Given another app')
+
+    # Then we see the feature was updated
+    feature.should.equal(gherkin.parse(doc.text))
+    feature.background.steps[0].title.text.should.equal('Given another app')
+
+
+def test_document_edit_quotes():
+    "Document.edit() Should follow multi line strings across scenarios"
+
+    # Given a document
+    doc = Document(FEATURE)
+
+    # When the opening quotes of the second scenario are moved up to the
+    # first one
+    feature = edit(
+        doc,
+        'Given first\n\n  Scenario: Two\n    Given second\n      """\n',
+        'Given first\n      """\n  Scenario: Two\n    Given second\n')
+
+    # Then we see the second scenario is now part of a multi line string
+    feature.should.equal(gherkin.parse(doc.text))
+    [s.title.text for s in feature.scenarios].should.equal(['One', 'Three'])
+    feature.scenarios[0].steps[0].text.text.should.contain('Scenario: Two')
+
+
+def test_document_edit_syntax_error():
+    "Document.edit() Should raise SyntaxError when the new text doesn't parse"
+
+    # Given a document
+    doc = Document(FEATURE)
+
+    # When an edit breaks the feature
+    edit.when.called_with(doc, 'Scenario: Two', 'Examples:').should.throw(SyntaxError)
+
+    # Then we see there's no feature until the text is fixed
+    doc.feature.should.be.none
+    edit(doc, 'Examples:', 'Scenario: Two').should.equal(gherkin.parse(FEATURE))
+
+
+def test_document_edit_language():
+    "Document.edit() Should parse scenarios in the language of the document"
+
+    # Given a document in Portuguese
+    doc = Document(
+        '# language: pt-br\n'
+        'Funcionalidade: Lanches\n'
+        '  Cenário: Um\n'
+        '    Dada uma maçã\n'
+        '  Cenário: Dois\n'
+        '    Dada uma pera\n')
+
+    # When the second scenario is edited
+    feature = edit(doc, 'uma pera', 'duas peras')
+
+    # Then we see it was parsed in Portuguese
+    feature.should.equal(gherkin.parse(doc.text))
+    feature.scenarios[1].steps[0].title.text.should.equal('Dada duas peras')
@@ -0,0 +1,119 @@
+# -*- coding: utf-8; -*-
+
+import shutil
+
+import gherkin
+from gherkin import bulk
+from gherkin.instrument import Profile, format_report
+
+from .test_bulk import make_tree
+
+
+FEATURE = '''Feature: Profiled
+  Scenario: One
+    Given a table:
+      | a | b |
+'''
+
+
+def test_profile_parse():
+    "parse() Should count the calls of the lexer and parser when profiled"
+
+    # Given a profile
+    profile = Profile()
+
+    # When a feature is parsed with it
+    feature = gherkin.parse(FEATURE, 'char', profile=profile)
+    report = profile.report()
+
+    # Then we see the feature is the same we get without profiling
+    feature.should.equal(gherkin.parse(FEATURE, 'char'))
+
+    # And that calls and tokens were counted
+    report['files'].should.equal(1)
+    report['functions']['Parser.parse_feature']['calls'].should.equal(1)
+    report['functions']['Parser.parse_table']['calls'].should.equal(1)
+    report['functions']['Lexer.lex_field']['calls'].should.equal(3)
+    report['functions']['lexer']['calls'].should.equal(
+        sum(report['tokens'].values()) + 1)
+    report['tokens'].should.equal({
+        'TOKEN_LABEL': 3, 'TOKEN_TEXT': 2, 'TOKEN_TABLE_COLUMN': 2,
+        'TOKEN_NEWLINE': 4, 'TOKEN_EOF': 1,
+    })
+
+
+def test_profile_parse_scanner():
+    "parse() Should time each state of the scanner engine when profiled"
+
+    # Given a profile
+    profile = Profile()
+
+    # When a feature is parsed with the default engine
+    feature = gherkin.parse(FEATURE, profile=profile)
+    functions = profile.report()['functions']
+
+    # Then we see the feature is the same we get without profiling
+    feature.should.equal(gherkin.parse(FEATURE))
+
+    # And that the searches of each state were counted within the lexer
+    functions['ScannerLexer.text']['calls'].should.equal(10)
+    functions['ScannerLexer.field']['calls'].should.equal(5)
+    functions.should_not.have.key('ScannerLexer.tag')
+    lexer = functions['lexer']
+    lexer['own_seconds'].should.be.lower_than(lexer['seconds'])
+
+
+def test_profile_own_seconds():
+    "Profile.report() Should not count the time of nested calls as own time"
+
+    # Given a profiled parse
+    profile = Profile()
+    gherkin.parse(FEATURE, 'scanner', profile=profile)
+
+    # When the report is taken
+    functions = profile.report()['functions']
+
+    # Then we see the feature includes all the time of its productions
+    feature = functions['Parser.parse_feature']
+    feature['own_seconds'].should.be.lower_than(feature['seconds'])
+    sum(function['own_seconds'] for function in functions.values()).should.equal(
+        functions['parse']['seconds'], epsilon=1e-6)
+
+
+def test_profile_merge():
+    "Profile.merge() Should add up the reports of other profiles"
+
+    # Given a couple of profiled parses
+    first, second = Profile(), Profile()
+    gherkin.parse(FEATURE, profile=first)
+    gherkin.parse(FEATURE, profile=second)
+
+    # When one is merged into another
+    first.merge(second.report())
+    report = first.report()
+
+    # Then we see the counters were added up
+    report['files'].should.equal(2)
+    report['functions']['Parser.parse_feature']['calls'].should.equal(2)
+    report['tokens']['TOKEN_EOF'].should.equal(2)
+    format_report(report).should.contain('2 files, 24 tokens')
+
+
+def test_parse_tree_profile():
+    "bulk.parse_tree() Should report the profile of each file when asked"
+
+    for workers in (1, 2):
+        # Given a directory tree with a few feature files
+        root = make_tree()
+
+        try:
+            # When it's parsed with profiling
+            results = list(bulk.parse_tree(root, workers, profile=True))
+            plain = list(bulk.parse_tree(root, workers))
+        finally:
+            shutil.rmtree(root)
+
+        # Then we see each parsed file carries its report
+        [result.profile['files'] for result in results
+         if result.feature].should.equal([1, 1, 1])
+        [result.profile for result in plain].should.equal([None] * 4)
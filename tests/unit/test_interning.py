@@ -0,0 +1,103 @@
+# -*- coding: utf-8; -*-
+
+import shutil
+import tempfile
+
+import gherkin
+from gherkin import bulk
+from gherkin.interning import Interner, format_report
+
+from .test_bulk import write_features
+
+
+FEATURE = '''@web
+Feature: Interned {0}
+  Scenario: First
+    Given I am logged in
+      | name | age |
+      | John | 30  |
+
+  @web
+  Scenario: Second
+    Given I am logged in
+'''
+
+
+def test_parse_interner():
+    "parse() Should share repeated strings through an interner"
+
+    # Given an interner
+    interner = Interner()
+
+    # When two features are parsed with it
+    first = gherkin.parse(FEATURE.format(1), interner=interner)
+    second = gherkin.parse(FEATURE.format(2), interner=interner)
+
+    # Then we see they're the same features parsed without it
+    first.should.equal(gherkin.parse(FEATURE.format(1)))
+
+    # And that the same step title, tag and table cell are a single string
+    titles = [scenario.steps[0].title.text
+              for feature in (first, second) for scenario in feature.scenarios]
+    set(map(id, titles)).should.have.length_of(1)
+    second.scenarios[1].tags[0].should.be(first.tags[0])
+    second.scenarios[0].steps[0].table.fields[0][0].should.be(
+        first.scenarios[0].steps[0].table.fields[0][0])
+
+    # And that hits were counted
+    report = interner.report()
+    report['lookups'].should.equal(28)
+    report['values'].should.equal(12)
+    report['hits'].should.equal(16)
+    report['saved_bytes'].should.be.greater_than(0)
+    format_report(report).should.contain('Interned 12 values out of 28')
+
+
+def test_interner_feature():
+    "Interner.feature() Should share the strings of a feature already parsed"
+
+    # Given a feature parsed with an interner and another without it
+    interner = Interner()
+    first = gherkin.parse(FEATURE.format(1), interner=interner)
+    second = gherkin.parse(FEATURE.format(2))
+
+    # When the second one is interned
+    interner.feature(second).should.equal(gherkin.parse(FEATURE.format(2)))
+
+    # Then we see it shares the strings of the first one
+    second.scenarios[0].steps[0].title.text.should.be(
+        first.scenarios[0].steps[0].title.text)
+    second.tags[0].should.be(first.tags[0])
+
+    # And that descriptions are shared too
+    text = ('Feature: Described\n  Shared by both\n'
+            '  Scenario: S\n    Once more\n    Given a step\n')
+    described = [interner.feature(gherkin.parse(text)) for _ in range(2)]
+    described[1].description.text.should.be(described[0].description.text)
+    described[1].scenarios[0].description.text.should.be(
+        described[0].scenarios[0].description.text)
+
+
+def test_parse_tree_interner():
+    "bulk.parse_tree() Should share strings across the files it parses"
+
+    for workers in (1, 2):
+        # Given a directory tree with features that repeat themselves
+        root = tempfile.mkdtemp()
+        write_features(root, {
+            'a.feature': FEATURE.format('a'),
+            'b.feature': FEATURE.format('b'),
+        })
+        interner = Interner()
+
+        try:
+            # When it's parsed with an interner
+            a, b = [result.feature for result in
+                    bulk.parse_tree(root, workers, interner=interner)]
+        finally:
+            shutil.rmtree(root)
+
+        # Then we see the features share their step titles
+        b.scenarios[1].steps[0].title.text.should.be(
+            a.scenarios[0].steps[0].title.text)
+        interner.report()['hits'].should.be.greater_than(0)
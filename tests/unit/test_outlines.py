@@ -0,0 +1,138 @@
+# -*- coding: utf-8; -*-
+
+import types
+
+import gherkin
+from gherkin import Ast, outlines
+
+
+FEATURE = '''Feature: Outlines
+  @outline
+  Scenario Outline: Eat <eaten> of <start>
+    Given there are <start> cucumbers
+    When I eat <eaten> {of them}
+      """
+      <eaten> cucumbers and <unknown> ones
+      """
+    Then I should have:
+      | left   | eaten   |
+      | <left> | <eaten> |
+    And I'm full
+  @examples
+  Examples:
+    | start | eaten | left |
+    | 12    | 5     | 7    |
+    | 20    | 5     | 15   |
+'''
+
+
+def test_template():
+    "Template() Should fill the placeholders of the columns it knows"
+
+    # Given a template for a table with two columns
+    template = outlines.Template(
+        '<a> and {<b>} but not <c>', {'a': 0, 'b': 1})
+
+    # When it's rendered; Then we see the columns were filled in, and the
+    # unknown placeholders and braces were kept
+    template.static.should.be.false
+    template.render('1', '2').should.equal('1 and {2} but not <c>')
+
+
+def test_template_static():
+    "Template() Should give back the same text when there's nothing to fill"
+
+    # Given a template without any known placeholder
+    text = 'nothing to <see>'
+    template = outlines.Template(text, {'a': 0})
+
+    # When it's rendered; Then we see the text itself
+    template.static.should.be.true
+    template.render('1').should.be(text)
+
+
+def test_expand():
+    "expand() Should yield one scenario per row of the examples"
+
+    # Given an outline
+    outline = gherkin.parse(FEATURE).scenarios[0]
+
+    # When it's expanded
+    scenarios = outlines.expand(outline)
+
+    # Then we see scenarios come out of a generator
+    scenarios.should.be.a(types.GeneratorType)
+    scenarios = list(scenarios)
+
+    # And that each one has the values of its row
+    scenarios[1].should.equal(Ast.Scenario(
+        line=17,
+        title=Ast.Text(line=3, text='Eat 5 of 20'),
+        tags=['outline', 'examples'],
+        steps=[
+            Ast.Step(line=4, title=Ast.Text(
+                line=4, text='Given there are 20 cucumbers')),
+            Ast.Step(
+                line=5,
+                title=Ast.Text(line=5, text='When I eat 5 {of them}'),
+                text=Ast.Text(line=6, text=(
+                    '\n      5 cucumbers and <unknown> ones\n      '))),
+            Ast.Step(
+                line=9,
+                title=Ast.Text(line=9, text='Then I should have'),
+                table=Ast.Table(line=10, fields=[
+                    ['left', 'eaten'], ['15', '5']])),
+            Ast.Step(line=12, title=Ast.Text(line=12, text="And I'm full")),
+        ]))
+    [s.line for s in scenarios].should.equal([16, 17])
+
+    # And that steps without placeholders are shared
+    scenarios[0].steps[3].should.be(outline.steps[3])
+    scenarios[1].steps[3].should.be(outline.steps[3])
+
+
+def test_expand_empty_cells():
+    "expand() Should refuse rows with a different number of cells than the header"
+
+    # Given an outline with an empty cell in the middle of a row, which
+    # the lexer drops
+    outline = gherkin.parse('''Feature: Outlines
+  Scenario Outline: Outline
+    Given <first> <middle> <last>
+  Examples:
+    | first | middle | last  |
+    | bob   |        | smith |
+''').scenarios[0]
+
+    # When it's expanded; Then we see the row isn't guessed
+    list.when.called_with(outlines.expand(outline)).should.throw(
+        ValueError, 'Row in line 6 of the examples has 2 cells, '
+        'but the header has 3')
+
+
+def test_expand_tags():
+    "expand() Should give each scenario its own list of tags"
+
+    scenarios = list(outlines.expand(gherkin.parse(FEATURE).scenarios[0]))
+
+    scenarios[0].tags.should.equal(['outline', 'examples'])
+    scenarios[0].tags.append('changed')
+    scenarios[1].tags.should.equal(['outline', 'examples'])
+
+
+def test_expand_feature():
+    "expand_feature() Should expand outlines and keep other scenarios"
+
+    # Given a feature with a scenario and an outline
+    feature = gherkin.parse(FEATURE + '''
+  Scenario: Plain
+    Given nothing
+''')
+
+    # When it's expanded
+    scenarios = list(outlines.expand_feature(feature))
+
+    # Then we see the outline became two scenarios and the other was kept
+    [s.title.text for s in scenarios].should.equal(
+        ['Eat 5 of 12', 'Eat 5 of 20', 'Plain'])
+    scenarios[2].should.be(feature.scenarios[1])
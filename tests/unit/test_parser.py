@@ -1,5 +1,12 @@
 # -*- coding: utf-8; -*-
 
+import io
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
 import gherkin
 from gherkin import Lexer, Parser, Ast
 
@@ -576,6 +583,19 @@ def test_parse_metadata():
     metadata.should.equal(Ast.Metadata(line=1, key='language', value='pt-br'))
 
 
+def test_parse_language_with_trailing_whitespace():
+    "parse() Should find the language of headers with trailing spaces or CRLF"
+
+    for document in ('# language: pt-br  \nFuncionalidade: F\n',
+                     '# language: pt-br\r\nFuncionalidade: F\r\n'):
+        for lexer in ('char', 'scanner'):
+            # When the feature is parsed; Then we see it's in Portuguese,
+            # like skim() finds it
+            feature = gherkin.parse(document, lexer)
+            feature.line.should.equal(2)
+            feature.title.text.should.equal(gherkin.skim(document).title)
+
+
 def test_parse_empty_title():
 
     parser = Parser([
@@ -826,6 +846,110 @@ Feature: Feature title
         "`Background' should not be declared here, Scenario or Scenario Outline expected")
 
 
+def test_compiled_languages_lazy():
+    "compiled_languages() Should only compile the languages that are used"
+
+    # Given the compiled keyword tables
+    compiled = gherkin.parser.compiled_languages()
+
+    # When a single language is looked up
+    table = compiled['pt-br']
+
+    # Then we see only that language was compiled
+    list(compiled.compiled).should.equal(['pt-br'])
+    table['feature'].match('Funcionalidade').shouldnt.be.none
+
+    # And that all the languages are still listed
+    sorted(compiled).should.equal(sorted(gherkin.languages.LANGUAGES))
+    ('en' in compiled).should.be.true
+    compiled.get('xx').should.be.none
+    list(compiled.compiled).should.equal(['pt-br'])
+
+
+def test_parse_label_prefix():
+    "Parser.parse_feature() Should not take labels starting with a keyword for it"
+
+    parser = gherkin.Parser(gherkin.Lexer('''
+Feature: Feature title
+  ScenarioX: Scenario title
+    Given first step
+    ''').run())
+
+    parser.parse_feature.when.called.should.throw(
+        SyntaxError,
+        "`ScenarioX' should not be declared here, Scenario or Scenario Outline expected")
+
+
+def test_keywords_classify():
+    "Keywords.classify() Should tell every keyword a label is"
+
+    # Given the keywords of a couple languages
+    english = gherkin.Keywords(gherkin.languages.LANGUAGES['en'])
+    czech = gherkin.Keywords(gherkin.languages.LANGUAGES['cz'])
+
+    # When we classify labels; Then we see labels must be whole keywords
+    english.classify('Scenario').should.equal(set(['scenario']))
+    english.classify('Scenario Outline ').should.equal(set(['scenario_outline']))
+    english.classify('Scenarios').should.equal(set(['examples']))
+    english.classify('ScenarioX').should.be.empty
+
+    # And that steps only need to start with `given'
+    english.classify('Given a step').should.equal(set(['given']))
+    english.classify('Givenchy').should.be.empty
+    english.classify(None).should.be.empty
+
+    # And that a label can be more than one keyword
+    czech.classify('Požadavek').should.equal(set(['feature', 'scenario']))
+
+
+def test_parse_language():
+    "Parser.parse_feature() Should match keywords in the language of the header"
+
+    # Given a feature in Portuguese, with comments before it
+    parser = gherkin.Parser(gherkin.Lexer('''# language: pt-br
+# Um comentário
+
+Funcionalidade: Interpretador para gherkin
+  Para escrever testes de aceitação
+Contexto:
+  Dado que a variavel "X" contém o número 2
+Cenário: Lanche
+  Dada uma maçã
+  Quando mordida
+''').run())
+
+    # When we parse it
+    feature = parser.parse_feature()
+
+    # Then we see the parser switched to Portuguese
+    parser.language.should.equal('pt-br')
+    feature.should.equal(Ast.Feature(
+        line=4,
+        title=Ast.Text(line=4, text='Interpretador para gherkin'),
+        description=Ast.Text(line=5, text='Para escrever testes de aceitação'),
+        background=Ast.Background(line=6, steps=[
+            Ast.Step(line=7, title=Ast.Text(
+                line=7, text='Dado que a variavel "X" contém o número 2')),
+        ]),
+        scenarios=[
+            Ast.Scenario(line=8, title=Ast.Text(line=8, text='Lanche'), steps=[
+                Ast.Step(line=9, title=Ast.Text(line=9, text='Dada uma maçã')),
+                Ast.Step(line=10, title=Ast.Text(line=10, text='Quando mordida')),
+            ]),
+        ]))
+
+
+def test_parse_unknown_language():
+    "Parser.parse_feature() Should complain about languages it doesn't know"
+
+    parser = gherkin.Parser(gherkin.Lexer('''# language: xx
+Feature: Feature title
+''').run())
+
+    parser.parse_feature.when.called.should.throw(
+        SyntaxError, "Unknown language `xx'")
+
+
 def test_parse_feature():
 
     parser = Parser([
@@ -1127,16 +1251,622 @@ def test_parse_tags_on_feature_and_scenario():
 
 def test_ast_node_equal():
 
-    # Given two different AST nodes
-    n1 = Ast.Node()
-    n2 = Ast.Node()
-
-    # And different attributes to each node
-    n1.name = 'Lincoln'
-    n2.color = 'green'
+    # Given two AST nodes of the same type
+    n1 = Ast.Text(line=1, text='Lincoln')
+    n2 = Ast.Text(line=1, text='green')
 
     # When I compare them
     equal = n1 == n2
 
     # Then I see they're different
     equal.should.be.false
+
+    # And that nodes of different types are different too
+    Ast.Examples(line=1).shouldnt.equal(Ast.Background(line=1, steps=[]))
+
+
+def test_ast_node_slots():
+    "Ast nodes Should keep their fields in slots instead of a __dict__"
+
+    node = Ast.Step(line=1, title=Ast.Text(line=1, text='Given a step'))
+
+    hasattr(node, '__dict__').should.equal(gherkin.parser.LEGACY_AST)
+    repr(node).should.equal(
+        "Step(line=1, title=Text(line=1, text='Given a step'), "
+        "table=None, text=None)")
+
+
+def test_ast_legacy_nodes():
+    "GHERKIN_LEGACY_AST Should bring back nodes that store fields in __dict__"
+
+    # Given a python process started with the legacy flag
+    environment = dict(os.environ, GHERKIN_LEGACY_AST='1')
+    script = (
+        'from gherkin import Ast\n'
+        'node = Ast.Node()\n'
+        'node.name = "Lincoln"\n'
+        'print(sorted(Ast.Text(line=1, text="hi").__dict__.items()))\n'
+        'print(node == Ast.Node())\n')
+
+    # When it uses the nodes through their __dict__
+    output = subprocess.check_output(
+        [sys.executable, '-c', script], env=environment,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))))
+
+    # Then we see they work like they always did
+    output.decode('utf-8').split().should.equal(
+        ["[('line',", "1),", "('text',", "'hi')]", 'False'])
+
+
+## Lexer engines
+
+
+LEXER_CORPUS = [
+    '',
+    'some text',
+    ' some text # random comment',
+    '# one line\n# another line',
+    'some text # metadata-field: blah-value\ntext',
+    '#comment without spaces\n',
+    'Feature: A cool feature\n  some more text\n  even more text',
+    '''# language: pt-br
+
+    Funcionalidade: Interpretador para gherkin
+      Para escrever testes de aceitação
+    Contexto:
+      Dado que a variavel "X" contém o número 2
+    Cenário: Lanche
+      Dada uma maçã
+    ''',
+    '''\
+  Feature: gherkin has steps with examples
+  Scenario Outline: Add two numbers
+    Given I have <input_1> and <input_2> the calculator
+    When I press "Sum"!
+  Examples:
+    | input_1 | input_2 | output |
+    | 20      | 30      | 50     |
+    | 0       | 40      |
+    | trailing | text
+    |   |  | empty cells |''',
+    '''\
+    Given the following email template:
+       \'\'\'Here we go with a pretty
+       big block of text
+       \'\'\'
+    And a cat picture
+       """Now notice we didn't use (:) above
+       """ and some text after it
+    Given x """inline""" and """never closed
+''',
+    '''\
+    @tagged-feature
+    Feature: Parse tags\r
+    @tag1 @tag2\t@tag3
+    Scenario: send to foo@bar.com
+    ''',
+]
+
+
+def test_scanner_lexer_matches_lexer_on_corpus():
+    "ScannerLexer.run() Should produce exactly the same tokens as Lexer.run()"
+
+    for document in LEXER_CORPUS:
+        # Given the same document loaded in both lexer engines
+        expected = gherkin.Lexer(document).run()
+
+        # When the scanner lexer runs
+        tokens = gherkin.ScannerLexer(document).run()
+
+        # Then we see both engines agree on every token
+        tokens.should.equal(expected)
+
+
+def test_scanner_lexer_with_lines():
+    "ScannerLexer.run() Should be able to lex an iterable of lines"
+
+    # Given a scanner lexer loaded with a list of lines instead of a
+    # single string
+    lexer = gherkin.ScannerLexer([
+        'Feature: Lines\n',
+        '  """doc\n',
+        '  string"""\n',
+    ])
+
+    # When we run the lexer
+    tokens = lexer.run()
+
+    # Then we see the multi line string was joined back together
+    tokens.should.equal([
+        (1, gherkin.TOKEN_LABEL, 'Feature'),
+        (1, gherkin.TOKEN_TEXT, 'Lines'),
+        (1, gherkin.TOKEN_NEWLINE, '\n'),
+        (2, gherkin.TOKEN_QUOTES, '"""'),
+        (2, gherkin.TOKEN_TEXT, 'doc\n  string'),
+        (3, gherkin.TOKEN_QUOTES, '"""'),
+        (3, gherkin.TOKEN_NEWLINE, '\n'),
+        (4, gherkin.TOKEN_EOF, ''),
+    ])
+
+
+def test_lex_unclosed_quotes():
+    "Lexer.run() Should stop at EOF when a multi line string is not closed"
+
+    # Given a lexer loaded with quotes that are never closed
+    lexer = gherkin.Lexer('"""first\nsecond')
+
+    # When we run the lexer
+    tokens = lexer.run()
+
+    # Then we see the text until EOF was captured
+    tokens.should.equal([
+        (1, gherkin.TOKEN_QUOTES, '"""'),
+        (1, gherkin.TOKEN_TEXT, 'first\nsecond'),
+        (2, gherkin.TOKEN_EOF, ''),
+    ])
+
+
+def test_tokenize_engines():
+    "tokenize() Should allow choosing the lexer engine"
+
+    # Given a small document
+    document = 'Feature: Engines\n  Scenario: Pick one\n'
+
+    # When it's tokenized by both engines
+    char = gherkin.tokenize(document, lexer='char')
+    scanner = gherkin.tokenize(document, lexer='scanner')
+
+    # Then we see both outputs are the same
+    scanner.should.equal(char)
+
+    # And that unknown engines are refused
+    gherkin.tokenize.when.called_with(document, lexer='nope').should.throw(
+        ValueError, "Unknown lexer engine `nope'")
+
+
+def test_parse():
+    "parse() Should lex and parse a document in one go"
+
+    feature = gherkin.parse('Feature: One go\n  Scenario: Parse\n    Given it\n')
+
+    feature.should.equal(Ast.Feature(
+        line=1,
+        title=Ast.Text(line=1, text='One go'),
+        scenarios=[Ast.Scenario(
+            line=2,
+            title=Ast.Text(line=2, text='Parse'),
+            steps=[Ast.Step(line=3, title=Ast.Text(line=3, text='Given it'))])]))
+
+
+## Streaming
+
+
+def test_lex_iter_tokens():
+    "Lexer.iter_tokens() Should yield the same tokens as Lexer.run()"
+
+    # Given a document with all sorts of tokens
+    document = LEXER_CORPUS[8]
+
+    # When the tokens are streamed out of the lexer
+    tokens = gherkin.Lexer(document).iter_tokens()
+
+    # Then we see they're the same ones collected by run()
+    list(tokens).should.equal(gherkin.Lexer(document).run())
+
+
+def test_token_window():
+    "TokenWindow Should only keep the latest tokens around"
+
+    # Given a window of two tokens over a generator
+    window = gherkin.TokenWindow(
+        ((1, gherkin.TOKEN_TEXT, str(i)) for i in range(5)), size=2)
+
+    # When we read the fourth token
+    window[3].should.equal((1, gherkin.TOKEN_TEXT, '3'))
+
+    # Then we see the previous one is still available
+    window[2].should.equal((1, gherkin.TOKEN_TEXT, '2'))
+
+    # And the ones before it were dropped
+    window.__getitem__.when.called_with(1).should.throw(LookupError)
+
+    # And that reading past the end reports EOF
+    window.__getitem__.when.called_with(5).should.throw(IndexError)
+
+
+def test_parse_streamed_tokens():
+    "Parser Should be able to consume tokens from a generator"
+
+    # Given a document with long runs of new lines, which the parser
+    # needs to backup over
+    document = ('Feature: Streaming\n' + '\n' * 40 +
+                '  Scenario: Blank lines\n    Given a step\n' + '\n' * 40 +
+                '    When another step\n      | a | b |\n\n\n'
+                '  Scenario: Last one\n    Then it works\n')
+
+    # When the tokens are streamed to the parser
+    feature = Parser(gherkin.ScannerLexer(document).iter_tokens()).parse_feature()
+
+    # Then we see the output is the same as parsing the full list
+    feature.should.equal(Parser(gherkin.Lexer(document).run()).parse_feature())
+
+
+def test_parse_streamed_tokens_after_labels():
+    "Parser Should backup over long runs of new lines after tags and labels"
+
+    # Given documents with runs of new lines after a tag and after
+    # labels without a title, which the parser peeks past
+    documents = [
+        ('Feature: Tags\n  Scenario: s\n    Given a\n\n  @t' + '\n' * 30 +
+         '  Scenario: b\n    Given c\n'),
+        ('Feature: Examples\n  Scenario Outline: s\n    Given <a>\n\n'
+         '  Examples:' + '\n' * 30 + '    | a |\n    | 1 |\n'),
+        'Feature: Untitled\n  Scenario:' + '\n' * 30 + '    Given c\n',
+    ]
+
+    for document in documents:
+        # When the tokens are streamed to the parser
+        feature = gherkin.parse(document)
+
+        # Then we see the output is the same as parsing the full list
+        feature.should.equal(Parser(gherkin.tokenize(document)).parse_feature())
+
+
+## Files
+
+
+def test_parse_file():
+    "parse_file() Should parse the feature saved in a file"
+
+    # Given a feature file saved with some non ascii characters
+    document = ('Feature: Arquivo\n  Scenario: Cenário\n'
+                '    Given a "maçã"\n      """\n      ação\n      """\n')
+    fd, path = tempfile.mkstemp(suffix='.feature')
+    with os.fdopen(fd, 'wb') as fileobj:
+        fileobj.write(document.encode('utf-8'))
+
+    try:
+        # When the file is parsed
+        feature = gherkin.parse_file(path)
+    finally:
+        os.unlink(path)
+
+    # Then we see it's the same as parsing its content
+    feature.should.equal(gherkin.parse(document))
+
+
+def test_parse_file_empty():
+    "parse_file() Should complain about empty files like parse() does"
+
+    # Given an empty file
+    fd, path = tempfile.mkstemp(suffix='.feature')
+    os.close(fd)
+
+    try:
+        # When the file is parsed, then we see the feature is missing
+        gherkin.parse_file.when.called_with(path).should.throw(
+            SyntaxError, 'Feature expected in the beginning of the file')
+    finally:
+        os.unlink(path)
+
+
+def test_parse_stream_encoding():
+    "parse_stream() Should decode the lines with the encoding it's given"
+
+    # Given a binary file object with a latin-1 feature
+    fileobj = io.BytesIO('Feature: Ação\n'.encode('latin-1'))
+
+    # When it's parsed
+    feature = gherkin.parse_stream(fileobj, encoding='latin-1')
+
+    # Then we see the title was decoded properly
+    feature.title.should.equal(Ast.Text(line=1, text='Ação'))
+
+
+def test_parse_file_wide_encoding():
+    "parse_file() Should decode encodings that aren't compatible with ascii"
+
+    # Given a feature saved in UTF-16, where new lines take two bytes
+    document = 'Feature: Ação\n  Scenario: Cenário\n    Given a step\n'
+    fd, path = tempfile.mkstemp(suffix='.feature')
+    with os.fdopen(fd, 'wb') as fileobj:
+        fileobj.write(document.encode('utf-16'))
+
+    try:
+        # When it's parsed from the file and from a file object
+        feature = gherkin.parse_file(path, encoding='utf-16')
+        streamed = gherkin.parse_stream(
+            io.BytesIO(document.encode('utf-16-le')), encoding='utf-16-le')
+    finally:
+        os.unlink(path)
+
+    # Then we see both are the same as parsing the text
+    feature.should.equal(gherkin.parse(document))
+    streamed.should.equal(feature)
+
+
+## Views
+
+
+VIEWS_DOCUMENT = '''# language: pt-br
+Funcionalidade: Visões
+  Uma descrição
+  em duas linhas
+
+  Esquema do Cenário: Somar <a>
+    Dado que somo <a>
+      | a | b |
+    E o texto:
+      """
+      Olá
+      """
+
+  Exemplos:
+    | a |
+    | 1 |
+'''
+
+
+def test_parse_views():
+    "parse() Should make texts views of the source when asked for views"
+
+    # Given a feature with descriptions, tables and multi line strings
+
+    # When it's parsed into views
+    feature = gherkin.parse(VIEWS_DOCUMENT, views=True)
+
+    # Then we see it's the same feature parsed without views
+    feature.should.equal(gherkin.parse(VIEWS_DOCUMENT))
+    gherkin.parse_stream(
+        io.BytesIO(VIEWS_DOCUMENT.encode('utf-8')), views=True).should.equal(
+            feature)
+
+    # And that titles and steps only point at the source
+    outline = feature.scenarios[0]
+    outline.title.should.be.a(Ast.TextView)
+    outline.title.chunk.should.be(VIEWS_DOCUMENT)
+    VIEWS_DOCUMENT[outline.title.start:outline.title.end].should.equal(
+        'Somar <a>')
+    outline.steps[1].text.should.be.a(Ast.TextView)
+    outline.steps[1].text.text.should.equal('\n      Olá\n      ')
+
+    # And that joined descriptions are plain texts
+    feature.description.should.equal(
+        Ast.Text(line=3, text='Uma descrição em duas linhas'))
+    feature.description.should_not.be.a(Ast.TextView)
+
+
+def test_parse_views_pickle():
+    "Ast.TextView Should be pickled as a plain Ast.Text"
+
+    # Given a view
+    view = gherkin.parse(VIEWS_DOCUMENT, views=True).title
+
+    # When it's pickled and loaded back
+    loaded = pickle.loads(pickle.dumps(view))
+
+    # Then we see the source was left behind
+    loaded.should.be.a(Ast.Text)
+    loaded.should_not.be.a(Ast.TextView)
+    loaded.should.equal(view)
+
+
+def test_parse_views_char_lexer():
+    "parse() Should refuse views with the char lexer, that has no spans"
+
+    gherkin.parse.when.called_with(
+        VIEWS_DOCUMENT, 'char', views=True).should.throw(
+            ValueError, "The `Lexer' lexer has no views support")
+
+
+## Recovering from errors
+
+
+BROKEN_DOCUMENT = '''# language: xx
+Feature: Broken
+  Scenario: Fine
+    Given a step
+
+  @tag
+  Scenario Outline: Without examples <a>
+    Given <a>
+
+Garbage: here
+  Scenario: Unclosed
+    Given a text:
+      """
+      never closed
+'''
+
+
+def test_parse_diagnostics():
+    "parse() Should report every error and still return the feature when given diagnostics"
+
+    # Given a document with a few errors
+    diagnostics = []
+
+    # When it's parsed recovering from errors
+    feature = gherkin.parse(BROKEN_DOCUMENT, diagnostics=diagnostics)
+
+    # Then we see all the errors were found with their lines and columns
+    [str(diagnostic) for diagnostic in diagnostics].should.equal([
+        "1:13: Unknown language `xx'",
+        '7:3: Scenario Outline without Examples',
+        "10:1: `Garbage' should not be declared here, "
+        "Scenario or Scenario Outline expected",
+        '13:7: Multi line string never closed',
+    ])
+
+    # And that everything else was parsed
+    [scenario.title.text for scenario in feature.scenarios].should.equal(
+        ['Fine', 'Without examples <a>', 'Unclosed'])
+    feature.scenarios[1].tags.should.equal(['tag'])
+    feature.scenarios[2].steps[0].text.text.should.equal(
+        '\n      never closed\n')
+
+    # And that the same file raises SyntaxError without diagnostics
+    gherkin.parse.when.called_with(BROKEN_DOCUMENT).should.throw(
+        SyntaxError, "Unknown language `xx'")
+
+
+def test_parse_diagnostics_without_feature():
+    "parse_stream() Should parse the scenarios of a file missing its feature"
+
+    # Given a stream of lines without a feature
+    fileobj = io.BytesIO(b'  Scenario: Orphan\n    Given a step\n')
+    diagnostics = []
+
+    # When it's parsed recovering from errors
+    feature = gherkin.parse_stream(fileobj, diagnostics=diagnostics)
+
+    # Then we see the missing feature was reported
+    diagnostics.should.equal([gherkin.Diagnostic(
+        1, 3, "Feature expected in the beginning of the file, "
+        "found `Scenario' though.")])
+
+    # And that its scenario was still found
+    feature.line.should.be.none
+    feature.scenarios[0].title.should.equal(Ast.Text(line=1, text='Orphan'))
+
+
+def test_parse_errors_without_asserts():
+    "parse() Should raise SyntaxError, not AssertionError, for incomplete outlines and strings"
+
+    gherkin.parse.when.called_with(
+        'Feature: F\n  Scenario Outline: O\n    Given <a>\n').should.throw(
+            SyntaxError, 'Scenario Outline without Examples')
+    gherkin.parse.when.called_with(
+        'Feature: F\n  Scenario: S\n    Given a:\n      """\n').should.throw(
+            SyntaxError, 'Multi line string never closed')
+
+    # And that empty multi line strings are fine
+    feature = gherkin.parse(
+        'Feature: F\n  Scenario: S\n    Given a:\n      """"""\n')
+    feature.scenarios[0].steps[0].text.should.equal(Ast.Text(line=4, text=''))
+
+
+## Token buffer
+
+
+def test_token_buffer():
+    "ScannerLexer.run_buffer() Should keep the tokens as offsets into the source"
+
+    # Given a document with tables and multi line strings
+    document = LEXER_CORPUS[9]
+
+    # When it's lexed into a buffer
+    buffer = gherkin.tokenize(document, buffer=True)
+
+    # Then we see the buffer holds the same tokens as the list
+    list(buffer).should.equal(gherkin.tokenize(document))
+    len(buffer).should.equal(len(gherkin.tokenize(document)))
+
+    # And that values are slices of the source
+    buffer.value(0).should.equal('Given the following email template')
+    (buffer.starts[0], buffer.ends[0]).should.equal((4, 38))
+
+
+def test_token_buffer_parse():
+    "Parser Should read tokens straight from a TokenBuffer"
+
+    document = 'Feature: Buffer\n  Scenario: Read\n    Given a table\n      | a | b |\n'
+
+    feature = Parser(gherkin.tokenize(document, buffer=True)).parse_feature()
+
+    feature.should.equal(gherkin.parse(document))
+
+
+def test_token_buffer_needs_scanner():
+    "tokenize() Should refuse to buffer tokens of the char lexer"
+
+    gherkin.tokenize.when.called_with('', lexer='char', buffer=True).should.throw(
+        ValueError, "The lexer engine `char' has no buffer support")
+
+
+def test_skim():
+    "skim() Should find the headers of the feature, scenarios and examples"
+
+    # Given a feature with steps, tables and multi line strings
+    text = '''@web
+Feature: Skimming
+  Some description
+  Background:
+    Given a background
+  @fast
+  Scenario: Fast
+    Given a table:
+      | Scenario: not a scenario |
+    And a text:
+      """
+      Scenario: Not a scenario either
+      """
+  @outline
+  Scenario Outline: Outline <a>
+    Given <a>
+  @slow
+  Examples:
+    | a |
+    | 1 |
+'''
+
+    # When it's skimmed
+    header = gherkin.skim(text)
+
+    # Then we see only the headers were found
+    header.should.equal(Ast.Header(
+        line=2, kind='feature', title='Skimming', tags=['web'], children=[
+            Ast.Header(line=7, kind='scenario', title='Fast', tags=['fast']),
+            Ast.Header(
+                line=15, kind='scenario_outline', title='Outline <a>',
+                tags=['outline'], children=[
+                    Ast.Header(line=18, kind='examples', tags=['slow']),
+                ]),
+        ]))
+
+    # And that they match the full parse
+    feature = gherkin.parse(text)
+    [(s.line, s.title.text, s.tags) for s in feature.scenarios].should.equal(
+        [(h.line, h.title, h.tags) for h in header.children])
+
+
+def test_skim_whitespace():
+    "skim() Should find the same titles parse() finds, whitespace included"
+
+    # Given scenarios with trailing whitespace, untitled ones and CRLF
+    for text in ('Feature: Spaces \n  Scenario:  x y \n  Scenario: \t\n'
+                 '  Scenario Outline:\tz\t\n    Given <a>\n'
+                 '  Examples:\n    | a |\n    | 1 |\n',
+                 'Feature: CRLF\r\n  Scenario: x\r\n  Scenario:\r\n'):
+        # When it's skimmed and parsed
+        header = gherkin.skim(text)
+        feature = gherkin.parse(text)
+
+        # Then we see the titles are the same
+        header.title.should.equal(feature.title.text)
+        [h.title for h in header.children].should.equal(
+            [s.title and s.title.text for s in feature.scenarios])
+
+
+def test_skim_language():
+    "skim() Should honor the language of the feature"
+
+    header = gherkin.skim('''# language: pt-br
+Funcionalidade: Lanches
+  Cenário: Maçã
+    Dada uma maçã
+''')
+
+    header.should.equal(Ast.Header(
+        line=2, kind='feature', title='Lanches', children=[
+            Ast.Header(line=3, kind='scenario', title='Maçã'),
+        ]))
+
+
+def test_skim_not_starting_with_feature():
+    "skim() Should complain when there's no feature"
+
+    gherkin.skim.when.called_with('Scenario: Scenario title\n').should.throw(
+        SyntaxError,
+        "Feature expected in the beginning of the file, "
+        "found `Scenario' though.")
@@ -0,0 +1,85 @@
+# -*- coding: utf-8; -*-
+
+import pickle
+
+import gherkin
+from gherkin import Ast, serialize
+
+
+FEATURE = '''# language: pt-br
+@web
+Funcionalidade: Ações
+  Descrição em português
+
+  Contexto:
+    Dado um sistema
+
+  @smoke @slow
+  Esquema do Cenário: Somar <a>
+    Dado que somo <a>
+      | a | b |
+      | 1 |
+    E o texto:
+      """
+      Olá
+      """
+
+  @db
+  Exemplos:
+    | a |
+    | 1 |
+    | 2 |
+
+  Cenário: Outro
+    Dado um sistema
+'''
+
+
+def test_dumps_and_loads():
+    "loads() Should bring back the same feature given to dumps()"
+
+    # Given a feature with every kind of node
+    feature = gherkin.parse(FEATURE)
+
+    # When it's encoded and decoded back
+    data = serialize.dumps(feature)
+    decoded = serialize.loads(data)
+
+    # Then we see nothing was lost
+    decoded.should.equal(feature)
+    repr(decoded).should.equal(repr(feature))
+
+    # And that the encoding is smaller than pickle's
+    len(data).should.be.lower_than(
+        len(pickle.dumps(feature, pickle.HIGHEST_PROTOCOL)))
+
+
+def test_dumps_unusual_values():
+    "dumps() Should encode missing and far apart lines, and strings with NULs"
+
+    # Given a feature built by hand with unusual values
+    feature = Ast.Feature(scenarios=[
+        Ast.Scenario(line=100000, title=Ast.Text(line=3, text='a\x00b'),
+                     steps=[Ast.Step(line=5, title=Ast.Text(line=5, text='\x00'),
+                                     table=Ast.Table(line=6, fields=[[], ['x']]))]),
+        Ast.ScenarioOutline(line=7, title=Ast.Text(line=7, text='')),
+    ])
+
+    # When it's encoded and decoded back; Then we see it's still the same
+    serialize.loads(serialize.dumps(feature)).should.equal(feature)
+    serialize.loads(serialize.dumps(Ast.Feature())).should.equal(Ast.Feature())
+
+
+def test_loads_errors():
+    "loads() Should complain about data it can't decode"
+
+    data = serialize.dumps(gherkin.parse(FEATURE))
+
+    serialize.loads.when.called_with(b'GHK').should.throw(
+        ValueError, 'Truncated encoded feature')
+    serialize.loads.when.called_with(b'X' + data[1:]).should.throw(
+        ValueError, 'Not an encoded feature')
+    serialize.loads.when.called_with(data[:4] + b'\xff' + data[5:]).should.throw(
+        ValueError, "Unsupported encoded feature version `255'")
+    serialize.loads.when.called_with(data[:-10]).should.throw(
+        ValueError, 'Truncated encoded feature')
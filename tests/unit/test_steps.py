@@ -0,0 +1,104 @@
+# -*- coding: utf-8; -*-
+
+import gherkin
+from gherkin.steps import StepMatch, StepRegistry, literal_prefix, without_groups
+
+
+def test_literal_prefix():
+    "literal_prefix() Should find the text every match of a pattern starts with"
+
+    literal_prefix(r'I have (\d+) apples').should.equal('I have ')
+    literal_prefix(r'^the user').should.equal('the user')
+    literal_prefix(r'an? apple').should.equal('a')
+    literal_prefix(r'(?:a|an) apple').should.equal('')
+    literal_prefix(r'an apple|a pear').should.equal('')
+    literal_prefix(r'I (like|hate) [|] pears').should.equal('I ')
+
+
+def test_without_groups():
+    "without_groups() Should only turn capturing groups into non capturing ones"
+
+    without_groups(r'a (b) [(] \( (?:c) \\(d)').should.equal(
+        r'a (?:b) [(] \( (?:c) \\(?:d)')
+
+
+def test_registry_match():
+    "StepRegistry.match() Should return the first definition registered that matches"
+
+    # Given definitions that overlap and some that can't be combined
+    registry = StepRegistry()
+    have = registry.add(r'I have (\d+) (\w+)')
+    registry.add(r'I have (?P<count>\d+) apples')
+    pears = registry.add(r'(.*) pears')
+    same = registry.add(r'I (\w+) \1 twice')
+    ignored = registry.add(r'(?i)i HAVE NOTHING')
+
+    # When steps are matched; Then we see the first one registered wins
+    registry.match('I have 3 apples').should.equal(
+        StepMatch(have, ('3', 'apples')))
+    registry.match('I have 3 pears').should.equal(
+        StepMatch(have, ('3', 'pears')))
+    registry.match('some pears').should.equal(StepMatch(pears, ('some',)))
+
+    # And that patterns must match the whole text
+    registry.match('I have 3 apples today').should.be.none
+
+    # And that definitions kept apart capture their arguments too
+    registry.match('I say say twice').should.equal(StepMatch(same, ('say',)))
+    registry.match('i have nothing').should.equal(StepMatch(ignored))
+    registry.matches.should.contain('I have 3 apples')
+
+    # And that named groups are passed as keyword arguments
+    registry = StepRegistry()
+    apples = registry.add(r'I have (?P<count>\d+) apples')
+    registry.match('I have 3 apples').should.equal(
+        StepMatch(apples, (), {'count': '3'}))
+
+
+def test_registry_many_definitions():
+    "StepRegistry.match() Should find the same definitions as trying them all in order"
+
+    # Given more definitions than fit a single combined pattern
+    registry = StepRegistry()
+    for index in range(100):
+        registry.add(r'step {} takes (\d+)'.format(index))
+        registry.add(r'(?:a|the) step {} takes (\w+)'.format(index))
+    registry.add(r'.*')
+
+    # When steps are matched; Then we see the results of the naive way
+    for text in ('step 42 takes 3', 'the step 99 takes x', 'step 7 takes x'):
+        expected = next(definition for definition in registry.definitions
+                        if definition.regex.fullmatch(text))
+        registry.match(text).definition.should.be(expected)
+
+
+def test_registry_match_feature():
+    "StepRegistry.match_feature() Should match the steps of a feature after their keywords"
+
+    # Given a registry with a couple of definitions
+    registry = StepRegistry()
+
+    @registry.step(r'I have (\d+) apples')
+    def have_apples(count):
+        return int(count)
+
+    registry.add(r'I eat them')
+
+    # When the steps of a feature are matched
+    feature = gherkin.parse('''Feature: Apples
+  Background:
+    Given I have 2 apples
+
+  Scenario: Eat
+    Given I eat them
+    Then I'm full
+''')
+    matches = [(step.line, match) for (step, match)
+               in registry.match_feature(feature)]
+
+    # Then we see every step was looked up, and undefined ones have no match
+    [(line, match and match.definition.pattern) for (line, match) in matches
+     ].should.equal([(3, r'I have (\d+) apples'), (6, r'I eat them'),
+                     (7, None)])
+    match = matches[0][1]
+    match.definition.function(*match.args).should.equal(2)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8; -*-
+
+import os
+import shutil
+import tempfile
+
+from gherkin import bulk, tags
+
+from .test_bulk import write_features
+
+
+def test_compile_expression():
+    "compile_expression() Should follow the precedence of not, and, or"
+
+    # Given an expression mixing all the operators
+    expression = tags.compile_expression('@a or not @b and @c')
+
+    # When it's matched; Then we see it reads as `@a or ((not @b) and @c)'
+    expression.match(['a', 'b']).should.be.true
+    expression.match(['c']).should.be.true
+    expression.match(['b', 'c']).should.be.false
+    expression.match([]).should.be.false
+
+
+def test_compile_expression_parenthesis():
+    "compile_expression() Should group operations within parenthesis"
+
+    expression = tags.compile_expression('@smoke and not (@slow or @db)')
+
+    expression.match(['smoke']).should.be.true
+    expression.match(['smoke', 'db']).should.be.false
+    tags.compile_expression('').match([]).should.be.true
+
+
+def test_compile_expression_errors():
+    "compile_expression() Should complain about invalid expressions"
+
+    tags.compile_expression.when.called_with('@a and').should.throw(
+        ValueError, "Unexpected end of the tag expression `@a and'")
+    tags.compile_expression.when.called_with('@a @b').should.throw(
+        ValueError, "Unexpected `@b' in the tag expression `@a @b'")
+    tags.compile_expression.when.called_with('(@a or @b').should.throw(
+        ValueError, "Unexpected end of the tag expression `(@a or @b'")
+    tags.compile_expression.when.called_with('smoke').should.throw(
+        ValueError, "Unexpected `smoke' in the tag expression `smoke'")
+
+
+def make_suite(root):
+    write_features(root, {
+        'a.feature': '''@web
+Feature: A
+  @smoke
+  Scenario: Fast
+    Given a
+
+  @smoke @slow
+  Scenario: Slow
+    Given a
+''',
+        'b.feature': '''Feature: B
+  @smoke
+  Scenario Outline: Outline
+    Given <a>
+  @db
+  Examples:
+    | a |
+    | 1 |
+
+  Scenario: Untagged
+    Given a
+''',
+    })
+
+
+def test_tag_index_select():
+    "TagIndex.select() Should find the scenarios selected by an expression"
+
+    # Given the index of a couple of features
+    root = tempfile.mkdtemp()
+    try:
+        make_suite(root)
+        index = tags.build_index(bulk.parse_tree(root, workers=1))
+
+        # When scenarios are selected
+        selected = index.select('@smoke and not (@slow or @db)')
+        web = index.select(tags.compile_expression('@web'))
+        untagged = index.select('not @smoke')
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see the tags of features and examples were inherited
+    selected.should.equal([(os.path.join(root, 'a.feature'), 4)])
+    [line for (_, line) in web].should.equal([4, 8])
+    untagged.should.equal([(os.path.join(root, 'b.feature'), 10)])
+
+
+def test_tag_index_save_and_load():
+    "TagIndex.load() Should bring back an index saved to a file"
+
+    # Given an index saved to a file
+    root = tempfile.mkdtemp()
+    try:
+        make_suite(root)
+        path = os.path.join(root, 'tags.json')
+        index = tags.build_index(bulk.parse_tree(root, workers=1))
+        index.save(path)
+
+        # When it's loaded back
+        loaded = tags.TagIndex.load(path)
+        outdated = loaded.outdated()
+
+        # And a file is changed afterwards
+        with open(os.path.join(root, 'b.feature'), 'a') as fileobj:
+            fileobj.write('\n')
+        changed = loaded.outdated()
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see it selects the same scenarios
+    loaded.select('@smoke').should.equal(index.select('@smoke'))
+    loaded.select('not @db').should.equal(index.select('not @db'))
+
+    # And that it knows which files changed
+    outdated.should.equal([])
+    changed.should.equal([os.path.join(root, 'b.feature')])
+
+
+def test_bulk_main_index():
+    "bulk.main() Should write the tag index of the features it parsed"
+
+    # Given a couple of features
+    root = tempfile.mkdtemp()
+    try:
+        make_suite(root)
+        path = os.path.join(root, 'tags.json')
+
+        # When they're parsed from the command line
+        status = bulk.main([root, '--workers', '1', '--index', path])
+        index = tags.TagIndex.load(path)
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see the index was written
+    status.should.equal(0)
+    len(index.select('')).should.equal(4)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8; -*-
+
+import os
+import shutil
+import tempfile
+
+import gherkin
+from gherkin import bulk, usage
+from gherkin.steps import StepRegistry
+
+from .test_bulk import write_features
+
+
+FIRST = '''Feature: First
+  Background:
+    Given I am logged in
+
+  Scenario: Buy
+    Given I have 2 apples
+    And I am logged in
+'''
+
+SECOND = '''Feature: Second
+  Scenario: Sell
+    Given I am logged in
+    Then nobody knows this step
+'''
+
+
+def test_step_usage():
+    "StepUsage.add() Should count each distinct step and where it's used"
+
+    # Given the steps of a couple of features
+    table = usage.StepUsage()
+    table.add('first.feature', gherkin.parse(FIRST))
+    table.add('second.feature', gherkin.parse(SECOND))
+
+    # When we look at them; Then we see keywords don't tell steps apart
+    len(table).should.equal(3)
+    table.duplicated().should.equal([('I am logged in', 3)])
+    table.where('And I am logged in').should.equal([
+        ('first.feature', 3), ('first.feature', 7), ('second.feature', 3)])
+    table.where('I was never used').should.equal([])
+
+    # And that definitions are checked once per distinct step
+    registry = StepRegistry()
+    registry.add(r'I am logged in')
+    unused = registry.add(r'I am logged out')
+    registry.add(r'I have (\d+) apples')
+    table.undefined(registry).should.equal(['nobody knows this step'])
+    table.unused(registry).should.equal([unused])
+
+
+def test_step_usage_without_postings():
+    "StepUsage Should only keep counts when told not to keep postings"
+
+    table = usage.StepUsage(postings=False)
+    table.add('first.feature', gherkin.parse(FIRST))
+
+    table.duplicated().should.equal([('I am logged in', 2)])
+    table.where.when.called_with('I am logged in').should.throw(
+        ValueError, 'Postings were not kept')
+
+
+def test_bulk_main_usage():
+    "bulk.main() Should write the step usage that gherkin.usage reports"
+
+    # Given a couple of features and a file of step definitions
+    root = tempfile.mkdtemp()
+    try:
+        write_features(root, {'a.feature': FIRST, 'b.feature': SECOND})
+        path = os.path.join(root, 'usage.json')
+        patterns = os.path.join(root, 'steps.txt')
+        with open(patterns, 'w') as fileobj:
+            fileobj.write('I am logged (in|out)\nI am lost\n')
+
+        # When they're parsed from the command line
+        status = bulk.main([root, '--workers', '1', '--usage', path])
+        table = usage.StepUsage.load(path)
+        registry = usage.load_patterns(patterns)
+    finally:
+        shutil.rmtree(root)
+
+    # Then we see the usage was written and loads back the same
+    status.should.equal(0)
+    table.duplicated().should.equal([('I am logged in', 3)])
+    table.where('I am logged in')[-1].should.equal(
+        (os.path.join(root, 'b.feature'), 3))
+    [definition.pattern for definition in table.unused(registry)].should.equal(
+        ['I am lost'])